@@ -1,12 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from streamlit_autorefresh import st_autorefresh
 from datetime import datetime
 
 from models.engine import TradingEngine
-from models.trader import Trader
+from models.trader import HFTTrader, Trader, TraderPool
 from utils.data_export import DataExporter
 from utils.csv_importer import CSVImporter
 
@@ -27,93 +26,188 @@ if 'engine' not in st.session_state:
     st.session_state.custom_symbols = []
     st.session_state.imported_symbols = []
 
-# Auto-refresh every 1000ms if simulation is running
-if st.session_state.simulation_running:
-    st_autorefresh(interval=1000, limit=None, key="hft_refresh")
+# Live panels are fragments that refresh themselves every second while the
+# simulation is running, so the sidebar never re-executes on a tick
+REFRESH_INTERVAL = "1s" if st.session_state.simulation_running else None
+
+# Tables carry raw numbers and leave currency formatting to the browser
+DOLLAR_COLUMN = st.column_config.NumberColumn(format="dollar")
+QUANTITY_COLUMN = st.column_config.NumberColumn(format="%d")
+TIME_COLUMN = st.column_config.DatetimeColumn(format="HH:mm:ss.SSS")
+BOOK_SEPARATOR = pd.DataFrame([{
+    'Side': '---',
+    'Price': np.nan,
+    'Quantity': np.nan,
+    'Total': np.nan
+}])
+
+
+DEFAULT_SYMBOLS = [
+    "AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "NVDA", "META", "NFLX", "AMD",
+    "INTC"
+]
+
+
+# The sorted symbol list lives in session state and is rebuilt only when the
+# custom or imported symbols change, not on every sidebar rerun
+def refresh_available_symbols():
+    st.session_state.available_symbols = sorted({
+        *DEFAULT_SYMBOLS, *st.session_state.custom_symbols,
+        *st.session_state.imported_symbols
+    })
+
+
+if 'available_symbols' not in st.session_state:
+    refresh_available_symbols()
+
+
+# The engine snapshot is cached on (engine, symbols, tick) so every panel
+# rendered within a tick shares one locked engine read; the engine object
+# itself is not hashed
+@st.cache_data(ttl=1.0, max_entries=64)
+def _cached_snapshot(engine_id, symbols, tick, _engine):
+    return _engine.snapshot(symbols, n_trades=20, depth=5)
 
 
-@st.cache_data
-def get_all_symbols(default, custom, imported):
-    return sorted(list(set(default + custom + imported)))
+def get_engine_snapshot():
+    engine = st.session_state.engine
+    symbols = tuple(st.session_state.get('symbols', ()))
+    return _cached_snapshot(id(engine), symbols, engine.tick, engine)
 
 
 def create_traders(num_traders, symbols, initial_cash, hft_mode=False):
+    # The mode picks the bot class once; its parameters live on the class
+    trader_class = HFTTrader if hft_mode else Trader
     traders = []
     for i in range(num_traders):
-        trader = Trader(trader_id=f"BOT_{i+1:03d}",
-                        initial_cash=initial_cash,
-                        symbols=symbols,
-                        engine=st.session_state.engine)
-        if hft_mode:
-            trader.order_frequency = 0.05
-            trader.min_order_size = 1  # ✅ Lowered from 5 or 10
-            trader.max_order_size = 10  # ✅ Lowered to ensure affordability
-            trader.price_volatility = 0.01
+        trader = trader_class(trader_id=f"BOT_{i+1:03d}",
+                              initial_cash=initial_cash,
+                              symbols=symbols,
+                              engine=st.session_state.engine)
+        st.session_state.engine.register_trader(trader)
         traders.append(trader)
     return traders
 
 
 def start_simulation():
     st.session_state.simulation_running = True
+    st.session_state.engine.start()
+    st.session_state.trader_pool = TraderPool(st.session_state.traders)
+    st.session_state.trader_pool.start()
 
 
 def stop_simulation():
     st.session_state.simulation_running = False
     st.session_state.engine.stop()
-    for trader in st.session_state.traders:
-        trader.stop_trading()
-
-
-def create_orderbook_chart(symbol):
-    orderbook = st.session_state.engine.get_orderbook(symbol)
-    bids, asks = orderbook.get_top_levels(5)
-    fig = go.Figure()
-    if bids:
-        fig.add_trace(
-            go.Bar(x=[b.quantity for b in bids],
-                   y=[b.price for b in bids],
-                   orientation='h',
+    if st.session_state.get('trader_pool') is not None:
+        st.session_state.trader_pool.stop()
+        st.session_state.trader_pool = None
+
+
+# Identifies what the order book panel would draw, so quiet books can reuse
+# the previous chart traces and table. The levels themselves are kept rather
+# than a hash of them, so two different books can never compare equal
+def book_fingerprint(bids, asks):
+    return (tuple((level.price, level.quantity) for level in bids),
+            tuple((level.price, level.quantity) for level in asks))
+
+
+def create_orderbook_chart(symbol, bids, asks, fingerprint):
+    # The figure is built once per symbol and only its trace data is swapped
+    # on later ticks, so the layout is not rebuilt every second
+    fig_key = f"ob_fig_{symbol}"
+    if fig_key not in st.session_state:
+        fig = go.Figure([
+            go.Bar(orientation='h',
                    name='Bids',
                    marker_color='green',
-                   opacity=0.7))
-    if asks:
-        fig.add_trace(
-            go.Bar(x=[-a.quantity for a in asks],
-                   y=[a.price for a in asks],
-                   orientation='h',
+                   opacity=0.7),
+            go.Bar(orientation='h',
                    name='Asks',
                    marker_color='red',
-                   opacity=0.7))
-    fig.update_layout(title=f"Order Book - {symbol}",
-                      xaxis_title="Quantity",
-                      yaxis_title="Price",
-                      height=400,
-                      barmode='overlay')
+                   opacity=0.7)
+        ])
+        fig.update_layout(title=f"Order Book - {symbol}",
+                          xaxis_title="Quantity",
+                          yaxis_title="Price",
+                          height=400,
+                          barmode='overlay')
+        st.session_state[fig_key] = fig
+
+    # engine.tick moves on every order for any symbol, so compare the
+    # displayed levels themselves before rewriting the traces
+    fig = st.session_state[fig_key]
+    fp_key = f"ob_fig_fp_{symbol}"
+    if st.session_state.get(fp_key) == fingerprint:
+        return fig
+
+    bid_prices = np.fromiter((level.price for level in bids),
+                             dtype=np.float64,
+                             count=len(bids))
+    bid_quantities = np.fromiter((level.quantity for level in bids),
+                                 dtype=np.float64,
+                                 count=len(bids))
+    ask_prices = np.fromiter((level.price for level in asks),
+                             dtype=np.float64,
+                             count=len(asks))
+    ask_quantities = np.fromiter((level.quantity for level in asks),
+                                 dtype=np.float64,
+                                 count=len(asks))
+    with fig.batch_update():
+        fig.data[0].x = bid_quantities
+        fig.data[0].y = bid_prices
+        fig.data[1].x = -ask_quantities
+        fig.data[1].y = ask_prices
+    st.session_state[fp_key] = fingerprint
     return fig
 
 
-def create_pnl_chart():
-    pnl_data = [{
-        'Trader': t.trader_id,
-        'Cash': t.cash,
-        'Portfolio Value': t.get_portfolio_value(),
-        'Total P&L': t.get_total_pnl()
-    } for t in st.session_state.traders]
-    if pnl_data:
-        df = pd.DataFrame(pnl_data)
-        fig = px.bar(df,
-                     x='Trader',
-                     y='Total P&L',
-                     color='Total P&L',
-                     title="Trader P&L",
-                     color_continuous_scale='RdYlGn')
-        fig.update_layout(height=300)
+def create_book_side_frame(side, levels):
+    prices = np.fromiter((level.price for level in levels),
+                         dtype=np.float64,
+                         count=len(levels))
+    quantities = np.fromiter((level.quantity for level in levels),
+                             dtype=np.int64,
+                             count=len(levels))
+    return pd.DataFrame({
+        'Side': np.full(len(levels), side),
+        'Price': prices,
+        'Quantity': quantities,
+        'Total': prices * quantities
+    })
+
+
+def create_pnl_chart(trader_stats):
+    if trader_stats.empty:
+        return None
+
+    if 'pnl_fig' not in st.session_state:
+        fig = go.Figure(
+            go.Bar(marker=dict(colorscale='RdYlGn',
+                               showscale=True,
+                               colorbar=dict(title='Total P&L'))))
+        fig.update_layout(title="Trader P&L",
+                          xaxis_title="Trader",
+                          yaxis_title="Total P&L",
+                          height=300)
+        st.session_state.pnl_fig = fig
+
+    # numpy arrays go out as compact base64 buffers instead of JSON floats
+    fig = st.session_state.pnl_fig
+    pnl = trader_stats['pnl'].to_numpy()
+    if (fig.data[0].y is not None and len(fig.data[0].y) == len(pnl)
+            and np.array_equal(fig.data[0].y, pnl)):
         return fig
-    return None
+    with fig.batch_update():
+        fig.data[0].x = trader_stats['trader_id'].tolist()
+        fig.data[0].y = pnl
+        fig.data[0].marker.color = pnl
+    return fig
 
 
+@st.fragment(run_every=REFRESH_INTERVAL)
 def create_performance_metrics():
-    stats = st.session_state.engine.get_performance_stats()
+    stats = get_engine_snapshot()['stats']
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Trades", stats['total_trades'])
     col2.metric("Trades/Second", f"{stats['trades_per_second']:.2f}")
@@ -121,34 +215,34 @@ def create_performance_metrics():
     col4.metric("Active Orders", stats['active_orders'])
 
 
-# UI Start
-st.title("🚀 High-Frequency Trading Simulation")
-st.markdown("Real-time order book simulation with algorithmic trading bots")
-
-# Sidebar
-with st.sidebar:
+# Sidebar controls run as their own fragment: interacting with them reruns
+# only the sidebar, and the live panels' ticks never re-instantiate them
+@st.fragment
+def render_sidebar():
     st.header("Simulation Controls")
     hft_mode = st.checkbox("🚀 High-Frequency Mode",
                            help="Enable 50ms order intervals")
     if hft_mode:
         st.info("⚡ HFT Mode Active")
 
-    default_symbols = [
-        "AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "NVDA", "META", "NFLX", "AMD",
-        "INTC"
-    ]
-    all_available_symbols = get_all_symbols(default_symbols,
-                                            st.session_state.custom_symbols,
-                                            st.session_state.imported_symbols)
+    all_available_symbols = st.session_state.available_symbols
     symbols = st.multiselect("Trading Symbols",
                              all_available_symbols,
                              default=all_available_symbols[:2])
+    # The main panels read the selection from session state, so a change
+    # made during a sidebar-only rerun needs a full rerun to reach them
+    if st.session_state.get('symbols') is None:
+        st.session_state.symbols = symbols
+    elif symbols != st.session_state.symbols:
+        st.session_state.symbols = symbols
+        st.rerun()
 
     custom_symbol = st.text_input("Add Custom Symbol")
     if st.button("Add") and custom_symbol:
         cs = custom_symbol.upper()
         if cs not in all_available_symbols:
             st.session_state.custom_symbols.append(cs)
+            refresh_available_symbols()
             st.rerun()
         else:
             st.warning("Symbol already exists")
@@ -192,10 +286,7 @@ with st.sidebar:
             st.warning("No trades to export")
 
     if st.button("Export Order Book Snapshot"):
-        orderbook_data = {
-            sym: st.session_state.engine.get_orderbook(sym).get_snapshot()
-            for sym in symbols
-        }
+        orderbook_data = st.session_state.engine.snapshot_all(symbols)
         if any(orderbook_data.values()):
             csv_data = st.session_state.data_exporter.export_orderbook_to_csv(
                 orderbook_data)
@@ -208,93 +299,133 @@ with st.sidebar:
         else:
             st.warning("No order book data")
 
-# Main Content
-create_performance_metrics()
 
-if symbols:
+@st.fragment(run_every=REFRESH_INTERVAL)
+def render_orderbook_panel(symbols):
     selected_symbol = st.selectbox("📊 Select Symbol", symbols)
     if selected_symbol:
+        bids, asks = get_engine_snapshot()['books'][selected_symbol]
+        fingerprint = book_fingerprint(bids, asks)
         col1, col2 = st.columns([1, 1])
         with col1:
-            fig = create_orderbook_chart(selected_symbol)
-            st.plotly_chart(fig, use_container_width=True)
+            fig = create_orderbook_chart(selected_symbol, bids, asks,
+                                         fingerprint)
+            st.plotly_chart(fig,
+                            key=f"ob_{selected_symbol}",
+                            use_container_width=True)
         with col2:
-            orderbook = st.session_state.engine.get_orderbook(selected_symbol)
-            bids, asks = orderbook.get_top_levels(5)
-            rows = []
-            for ask in reversed(asks):
-                rows.append({
-                    'Side': 'ASK',
-                    'Price': f"${ask.price:.2f}",
-                    'Quantity': ask.quantity,
-                    'Total': ask.price * ask.quantity
-                })
-            if bids and asks:
-                rows.append({
-                    'Side': '---',
-                    'Price': '---',
-                    'Quantity': '---',
-                    'Total': '---'
-                })
-            for bid in bids:
-                rows.append({
-                    'Side': 'BID',
-                    'Price': f"${bid.price:.2f}",
-                    'Quantity': bid.quantity,
-                    'Total': bid.price * bid.quantity
-                })
-            st.dataframe(pd.DataFrame(rows),
+            table_key = f"ob_table_{selected_symbol}"
+            cached = st.session_state.get(table_key)
+            if cached is not None and cached[0] == fingerprint:
+                table = cached[1]
+            else:
+                frames = [create_book_side_frame('ASK', asks[::-1])]
+                if bids and asks:
+                    frames.append(BOOK_SEPARATOR)
+                frames.append(create_book_side_frame('BID', bids))
+                table = pd.concat(frames, ignore_index=True)
+                st.session_state[table_key] = (fingerprint, table)
+            st.dataframe(table,
+                         column_config={
+                             'Price': DOLLAR_COLUMN,
+                             'Quantity': QUANTITY_COLUMN,
+                             'Total': DOLLAR_COLUMN
+                         },
                          use_container_width=True,
                          hide_index=True)
 
-st.subheader("📈 Recent Trades")
-recent_trades = st.session_state.engine.get_recent_trades(20)
-if recent_trades:
-    trades_df = pd.DataFrame([{
-        'Time':
-        t['timestamp'].strftime('%H:%M:%S.%f')[:-3],
-        'Symbol':
-        t['symbol'],
-        'Side':
-        t['side'],
-        'Price':
-        f"${t['price']:.2f}",
-        'Quantity':
-        t['quantity'],
-        'Buyer':
-        t['buyer_id'],
-        'Seller':
-        t['seller_id']
-    } for t in recent_trades])
-    st.dataframe(trades_df, use_container_width=True, hide_index=True)
-else:
-    st.info("No trades yet")
 
-if st.session_state.traders:
+@st.fragment(run_every=REFRESH_INTERVAL)
+def render_recent_trades():
+    st.subheader("📈 Recent Trades")
+    snapshot = get_engine_snapshot()
+    recent_trades = snapshot['trades']
+    if recent_trades:
+        # The table only changes when a trade prints, so it is rebuilt on a
+        # new trade count rather than on every tick
+        table_key = (id(st.session_state.engine),
+                     snapshot['stats']['total_trades'])
+        cached = st.session_state.get('trades_table')
+        if cached is not None and cached[0] == table_key:
+            trades_df = cached[1]
+        else:
+            raw = pd.DataFrame.from_records(
+                recent_trades, columns=TradingEngine.RECENT_TRADE_FIELDS)
+            trades_df = pd.DataFrame({
+                'Time': raw['timestamp'],
+                'Symbol': raw['symbol'],
+                'Side': raw['side'],
+                'Price': raw['price'],
+                'Quantity': raw['quantity'],
+                'Buyer': raw['buyer_id'],
+                'Seller': raw['seller_id']
+            })
+            st.session_state.trades_table = (table_key, trades_df)
+        st.dataframe(trades_df,
+                     column_config={
+                         'Time': TIME_COLUMN,
+                         'Price': DOLLAR_COLUMN
+                     },
+                     use_container_width=True,
+                     hide_index=True)
+    else:
+        st.info("No trades yet")
+
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def render_trader_performance():
     st.subheader("💰 Trader Performance")
-    pnl_fig = create_pnl_chart()
+    trader_ids = [t.trader_id for t in st.session_state.traders]
+    trader_stats = pd.DataFrame(
+        st.session_state.engine.get_trader_stats(trader_ids))
+    pnl_fig = create_pnl_chart(trader_stats)
     if pnl_fig:
-        st.plotly_chart(pnl_fig, use_container_width=True)
-    trader_data = [{
-        'Trader ID': t.trader_id,
-        'Cash': f"${t.cash:,.2f}",
-        'Portfolio Value': f"${t.get_portfolio_value():,.2f}",
-        'Total P&L': f"${t.get_total_pnl():,.2f}",
-        'Orders Sent': t.orders_sent,
-        'Orders Filled': t.orders_filled
-    } for t in st.session_state.traders]
-    st.dataframe(pd.DataFrame(trader_data),
+        st.plotly_chart(pnl_fig, key="pnl", use_container_width=True)
+    trader_table = pd.DataFrame({
+        'Trader ID': trader_stats['trader_id'],
+        'Cash': trader_stats['cash'],
+        'Portfolio Value': trader_stats['portfolio_value'],
+        'Total P&L': trader_stats['pnl'],
+        'Orders Sent': trader_stats['orders_sent'],
+        'Orders Filled': trader_stats['orders_filled']
+    })
+    st.dataframe(trader_table,
+                 column_config={
+                     'Cash': DOLLAR_COLUMN,
+                     'Portfolio Value': DOLLAR_COLUMN,
+                     'Total P&L': DOLLAR_COLUMN
+                 },
                  use_container_width=True,
                  hide_index=True)
     # Live metrics per trader
     st.subheader("📊 Live Trader Metrics")
-    for trader in st.session_state.traders:
+    for row in trader_stats.itertuples(index=False):
         col1, col2 = st.columns(2)
         with col1:
-            st.metric(f"{trader.trader_id} Cash", f"${trader.cash:,.2f}")
+            st.metric(f"{row.trader_id} Cash", f"${row.cash:,.2f}")
         with col2:
-            st.metric(f"{trader.trader_id} Portfolio",
-                      f"${trader.get_portfolio_value():,.2f}")
+            st.metric(f"{row.trader_id} Portfolio",
+                      f"${row.portfolio_value:,.2f}")
+
+
+# UI Start
+st.title("🚀 High-Frequency Trading Simulation")
+st.markdown("Real-time order book simulation with algorithmic trading bots")
+
+with st.sidebar:
+    render_sidebar()
+symbols = st.session_state.symbols
+
+# Main Content
+create_performance_metrics()
+
+if symbols:
+    render_orderbook_panel(symbols)
+
+render_recent_trades()
+
+if st.session_state.traders:
+    render_trader_performance()
 
 status_col1, status_col2 = st.columns([4, 4])
 
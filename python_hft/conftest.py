@@ -0,0 +1,2 @@
+# Tests import the app's packages (models, utils) the way app.py does, from
+# this directory; pytest puts a rootless conftest's directory on sys.path
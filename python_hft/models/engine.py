@@ -2,14 +2,25 @@ import threading
 import time
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
-import queue
+from itertools import islice
+
+import numpy as np
 
 from models.order import Order, OrderSide, OrderStatus
 from models.orderbook import OrderBook
+from models.trade import Trade
 
 
 class TradingEngine:
 
+    # Field order of the rows returned by get_recent_trades
+    RECENT_TRADE_FIELDS = ('timestamp', 'symbol', 'side', 'price', 'quantity',
+                           'buyer_id', 'seller_id')
+    # Empty polls the execution loop only yields for before it starts sleeping
+    IDLE_SPIN_POLLS = 1000
+    # Number of most recent order latencies kept for the average
+    LATENCY_WINDOW = 1024
+
     def get_all_symbols(self):
         """Return a list of all symbols currently being tracked in the engine"""
         return list(self.orderbooks.keys())
@@ -23,18 +34,42 @@ class TradingEngine:
         # Trade execution tracking
         self.trade_history = deque(maxlen=10000)
         self.executions_today = 0
+        # Numeric columns of the same trades, in a ring indexed by trade
+        # number, so per-symbol statistics are array reductions
+        capacity = self.trade_history.maxlen
+        self._trade_prices = np.empty(capacity, dtype=np.float64)
+        self._trade_quantities = np.empty(capacity, dtype=np.int64)
+        self._trade_symbols = np.empty(capacity, dtype=np.int32)
+        self._symbol_ids = {}  # symbol -> id used in _trade_symbols
 
         # Performance metrics
         self.start_time = datetime.now()
         self.total_trades = 0
         self.total_volume = 0
-        self.latency_measurements = deque(maxlen=1000)
+        # Ring of order latencies in ms, written at latency_count modulo
+        # its length, so recording one allocates nothing
+        self.latency_measurements = np.zeros(self.LATENCY_WINDOW)
+        self.latency_count = 0
+
+        # Monotonic version of the books, bumped on every book mutation so
+        # readers can tell whether anything changed since their last look
+        self.tick = 0
 
         # Threading
         self.is_running = False
-        self.order_queue = queue.Queue()
+        # Orders from everything other than registered traders. deque append
+        # and popleft are atomic, so producers on any thread need no lock
+        self.order_queue = deque()
+        # The shared queue followed by registered traders' order rings,
+        # replaced whole on registration so the execution loop can iterate
+        # it without a lock
+        self._order_sources = (self.order_queue,)
+        # Source the next batch starts draining from, rotated every batch
+        self._next_source = 0
         self.execution_thread = None
-        self.stats_lock = threading.Lock()
+        # Held by the execution thread around each batch of orders. Trades,
+        # counters and latencies are only written under it, so readers that
+        # need several of them to agree take it; single reads need nothing
         self.orders_lock = threading.Lock()
 
         # Order processing statistics (optimized for HFT)
@@ -58,8 +93,10 @@ class TradingEngine:
             self.execution_thread.join(timeout=2.0)
 
     def register_trader(self, trader):
-        """Register a trader with the engine"""
+        """Register a trader with the engine and start draining its orders"""
         self.traders[trader.trader_id] = trader
+        self._order_sources = (self.order_queue,) + tuple(
+            t.order_ring for t in self.traders.values())
 
     def get_orderbook(self, symbol):
         """Get or create order book for a symbol"""
@@ -68,37 +105,89 @@ class TradingEngine:
         return self.orderbooks[symbol]
 
     def submit_order(self, order):
-        """Submit an order for processing"""
+        """
+        Submit an order for processing
+        
+        Registered traders bypass this and append to their own order ring;
+        this queue serves everything else, such as CSV imports.
+        """
         order_submit_time = time.time()
         order.submit_time = order_submit_time
 
         # Add to queue for processing
-        self.order_queue.put(order)
+        self.order_queue.append(order)
+
+    def submit_orders(self, orders):
+        """
+        Submit a batch of orders for processing, in list order
+        
+        Args:
+            orders (list): Orders to queue
+        """
+        order_submit_time = time.time()
+        for order in orders:
+            order.submit_time = order_submit_time
+
+        # One extend queues the whole batch
+        self.order_queue.extend(orders)
 
     def _execution_loop(self):
         """Main execution loop that processes orders (optimized for HFT)"""
+        idle_polls = 0
         while self.is_running:
             try:
                 # Process orders in batches for better performance
                 orders_to_process = []
 
-                # Collect batch of orders with minimal blocking
-                start_time = time.time()
-                while len(orders_to_process) < self.batch_size and (
-                        time.time() - start_time) < 0.001:
-                    try:
-                        order = self.order_queue.get_nowait()
-                        orders_to_process.append(order)
-                    except queue.Empty:
+                # Each ring has a single producer and this thread as its only
+                # consumer, and the shared queue is only drained here, so no
+                # lock is needed. Every source gets an equal share of the
+                # batch first, starting from a source that rotates per batch,
+                # so no trader or the shared queue is starved under load
+                sources = self._order_sources
+                start = self._next_source % len(sources)
+                sources = sources[start:] + sources[:start]
+                share = max(1, self.batch_size // len(sources))
+                room = self.batch_size
+                append = orders_to_process.append
+                visited = 0
+                for source in sources:
+                    if not room:
                         break
-
-                # Process the batch
-                for order in orders_to_process:
-                    self._process_order(order)
-                    self.order_queue.task_done()
-
-                # If no orders, small sleep to prevent busy waiting
-                if not orders_to_process:
+                    visited += 1
+                    if source:
+                        take = min(len(source), share, room)
+                        room -= take
+                        for _ in range(take):
+                            append(source.popleft())
+                # The next batch carries on from the first source not visited
+                self._next_source = start + visited
+
+                # Then fill any spare room from whichever sources have more
+                for source in sources:
+                    if not room:
+                        break
+                    if source:
+                        take = min(len(source), room)
+                        room -= take
+                        for _ in range(take):
+                            append(source.popleft())
+
+                # Process the batch. This thread is the only writer, so the
+                # lock only fences off readers and is taken once per batch
+                # rather than once per order
+                if orders_to_process:
+                    with self.orders_lock:
+                        for order in orders_to_process:
+                            self._process_order(order)
+                    idle_polls = 0
+                elif idle_polls < self.IDLE_SPIN_POLLS:
+                    # Just yield the GIL for a while after activity, so a
+                    # burst of orders is picked up without a sleep floor
+                    idle_polls += 1
+                    time.sleep(0)
+                else:
+                    # Quiet for a while: small sleep to prevent busy waiting
                     time.sleep(0.0001)  # 0.1ms sleep for HFT performance
 
             except Exception as e:
@@ -106,26 +195,27 @@ class TradingEngine:
                 time.sleep(0.001)  # Brief pause on error
 
     def _process_order(self, order):
-        """Process a single order"""
+        """Process a single order, caller holds the orders lock"""
         process_start = time.time()
 
-        with self.orders_lock:
-            # Add to active orders
-            self.active_orders[order.order_id] = order
+        # Add to active orders
+        self.active_orders[order.order_id] = order
 
-            # Get order book
-            orderbook = self.get_orderbook(order.symbol)
+        # Get order book
+        orderbook = self.get_orderbook(order.symbol)
 
-            # Try to match the order
-            self._match_order(order, orderbook)
+        # Try to match the order
+        self._match_order(order, orderbook)
 
-            # If order still has quantity, add to book
-            if order.is_active() and order.quantity > 0:
-                orderbook.add_order(order)
-            else:
-                # Remove from active orders if completely filled or cancelled
-                if order.order_id in self.active_orders:
-                    del self.active_orders[order.order_id]
+        # If order still has quantity, add to book
+        if order.is_active() and order.quantity > 0:
+            orderbook.add_order(order)
+        else:
+            # Remove from active orders if completely filled or cancelled
+            if order.order_id in self.active_orders:
+                del self.active_orders[order.order_id]
+
+        self.tick += 1
 
         # Record processing latency
         process_end = time.time()
@@ -133,7 +223,9 @@ class TradingEngine:
 
         if hasattr(order, 'submit_time'):
             total_latency_ms = (process_end - order.submit_time) * 1000
-            self.latency_measurements.append(total_latency_ms)
+            self.latency_measurements[self.latency_count %
+                                      self.LATENCY_WINDOW] = total_latency_ms
+            self.latency_count += 1
 
         # Update statistics
         self._update_processing_stats()
@@ -149,11 +241,14 @@ class TradingEngine:
 
     def _match_buy_order(self, buy_order, orderbook):
         """Match a buy order against asks"""
+        asks = orderbook.asks
         while buy_order.quantity > 0 and buy_order.is_active():
-            best_ask = orderbook.get_best_ask()
-
-            if not best_ask or best_ask.price > buy_order.price:
+            # The cached top of book settles most orders (no cross) without
+            # touching the level itself
+            best_ticks = asks.best[0]
+            if best_ticks is None or best_ticks > buy_order.price_ticks:
                 break  # No more matching orders
+            best_ask = asks.get_best_order()
 
             # Execute trade
             trade_quantity = min(buy_order.quantity, best_ask.quantity)
@@ -161,20 +256,21 @@ class TradingEngine:
 
             self._execute_trade(buy_order, best_ask, trade_quantity,
                                 trade_price, orderbook)
+            # Also takes a completely filled ask off the book
+            asks.on_fill(best_ask, trade_quantity)
 
-            # Remove ask order if completely filled
             if best_ask.quantity == 0:
-                orderbook.remove_order(best_ask.order_id, OrderSide.SELL)
                 if best_ask.order_id in self.active_orders:
                     del self.active_orders[best_ask.order_id]
 
     def _match_sell_order(self, sell_order, orderbook):
         """Match a sell order against bids"""
+        bids = orderbook.bids
         while sell_order.quantity > 0 and sell_order.is_active():
-            best_bid = orderbook.get_best_bid()
-
-            if not best_bid or best_bid.price < sell_order.price:
+            best_ticks = bids.best[0]
+            if best_ticks is None or best_ticks < sell_order.price_ticks:
                 break  # No more matching orders
+            best_bid = bids.get_best_order()
 
             # Execute trade
             trade_quantity = min(sell_order.quantity, best_bid.quantity)
@@ -182,58 +278,64 @@ class TradingEngine:
 
             self._execute_trade(best_bid, sell_order, trade_quantity,
                                 trade_price, orderbook)
+            # Also takes a completely filled bid off the book
+            bids.on_fill(best_bid, trade_quantity)
 
-            # Remove bid order if completely filled
             if best_bid.quantity == 0:
-                orderbook.remove_order(best_bid.order_id, OrderSide.BUY)
                 if best_bid.order_id in self.active_orders:
                     del self.active_orders[best_bid.order_id]
 
     def _execute_trade(self, buy_order, sell_order, quantity, price,
                        orderbook):
-        """Execute a trade between two orders"""
-        trade_time = datetime.now()
+        """
+        Execute a trade between two orders
+
+        Each order and its trader are looked up once, and the fills, the
+        trade record and the notifications all work from those locals.
+        """
+        trade_time_ns = time.time_ns()
+        symbol = buy_order.symbol
+        buyer_id = buy_order.trader_id
+        seller_id = sell_order.trader_id
 
         # Fill both orders
         buy_order.fill(quantity, price)
         sell_order.fill(quantity, price)
 
-        # Create trade record
-        trade = {
-            'trade_id': f"{self.total_trades + 1:06d}",
-            'timestamp': trade_time,
-            'symbol': buy_order.symbol,
-            'quantity': quantity,
-            'price': price,
-            'buyer_id': buy_order.trader_id,
-            'seller_id': sell_order.trader_id,
-            'buy_order_id': buy_order.order_id,
-            'sell_order_id': sell_order.order_id,
-            'side': 'BUY'  # From the perspective of the aggressive order
-        }
-
-        # Add to trade history
-        with self.stats_lock:
-            self.trade_history.append(trade)
-            self.total_trades += 1
-            self.total_volume += quantity
+        # Create trade record; 'BUY' is the side of the aggressive order
+        trade = Trade(self.total_trades + 1, trade_time_ns, symbol, quantity,
+                      price, buyer_id, seller_id, buy_order.order_id,
+                      sell_order.order_id, 'BUY')
+
+        # Add to trade history. Only this thread writes these, under the
+        # orders lock, so no separate stats lock is taken per trade
+        self.trade_history.append(trade)
+        slot = self.total_trades % len(self._trade_prices)
+        self._trade_prices[slot] = price
+        self._trade_quantities[slot] = quantity
+        self._trade_symbols[slot] = self._symbol_ids.setdefault(
+            symbol, len(self._symbol_ids))
+        self.total_trades += 1
+        self.total_volume += quantity
 
         # Add to order book trade history
         orderbook.add_trade(trade)
 
         # Notify traders of fills
-        self._notify_trader_fill(buy_order, quantity, price)
-        self._notify_trader_fill(sell_order, quantity, price)
-
-    def _notify_trader_fill(self, order, quantity, price):
+        traders = self.traders
+        buyer = traders.get(buyer_id)
+        if buyer is not None:
+            self._notify_trader_fill(buyer, buy_order, quantity, price)
+        seller = traders.get(seller_id)
+        if seller is not None:
+            self._notify_trader_fill(seller, sell_order, quantity, price)
+
+    def _notify_trader_fill(self, trader, order, quantity, price):
         """Notify a trader that their order was filled"""
-        trader_id = order.trader_id
-        if trader_id in self.traders:
-            try:
-                trader = self.traders[trader_id]
-                trader.on_order_filled(order, quantity, price)
-            except Exception as e:
-                print(f"Error notifying trader {trader_id}: {e}")
+        try:
+            trader.on_order_filled(order, quantity, price)
+        except Exception as e:
+            print(f"Error notifying trader {order.trader_id}: {e}")
 
     def _update_processing_stats(self):
         """Update processing statistics"""
@@ -259,56 +361,188 @@ class TradingEngine:
 
                 # Remove from active orders
                 del self.active_orders[order_id]
+                self.tick += 1
                 return True
         return False
 
     def get_recent_trades(self, count=20):
-        """Get recent trades across all symbols"""
-        with self.stats_lock:
-            return list(self.trade_history)[-count:] if count > 0 else list(
-                self.trade_history)
+        """
+        Get recent trades across all symbols
+
+        Args:
+            count (int): Number of trades, all trades if not positive
+
+        Returns:
+            list: Tuples laid out as RECENT_TRADE_FIELDS, oldest first
+        """
+        with self.orders_lock:
+            trades = self._recent_trade_list(count)
+        return self._trade_rows(trades)
+
+    def _recent_trade_list(self, count):
+        """
+        Copy the most recent trades, oldest first, caller holds the orders
+        lock so the execution thread cannot append during the walk
+
+        Args:
+            count (int): Number of trades, all trades if not positive
+
+        Returns:
+            list: Trade objects
+        """
+        if count > 0:
+            # Walk back from the newest trade instead of copying the history
+            trades = list(islice(reversed(self.trade_history), count))
+            trades.reverse()
+            return trades
+        return list(self.trade_history)
+
+    @staticmethod
+    def _trade_rows(trades):
+        """Lay trades out as RECENT_TRADE_FIELDS tuples"""
+        return [(trade.timestamp, trade.symbol, trade.side, trade.price,
+                 trade.quantity, trade.buyer_id, trade.seller_id)
+                for trade in trades]
 
     def get_recent_trades_for_symbol(self, symbol, count=10):
         """Get recent trades for a specific symbol"""
-        with self.stats_lock:
-            symbol_trades = [
-                trade for trade in self.trade_history
-                if trade['symbol'] == symbol
-            ]
-            return symbol_trades[-count:] if count > 0 else symbol_trades
+        # The filtered walk runs in Python, so hold off the execution thread
+        with self.orders_lock:
+            # Newest first, stopping once enough trades have been found
+            symbol_trades = (trade for trade in reversed(self.trade_history)
+                             if trade.symbol == symbol)
+            if count > 0:
+                symbol_trades = islice(symbol_trades, count)
+            symbol_trades = list(symbol_trades)
+        symbol_trades.reverse()
+        return [trade.to_dict() for trade in symbol_trades]
+
+    def _symbol_trade_columns(self, symbol, count):
+        """
+        Get prices and quantities of a symbol's recent trades, oldest first,
+        caller holds the orders lock
+
+        Args:
+            symbol (str): Trading symbol
+            count (int): Number of most recent trades to include
+
+        Returns:
+            tuple: (prices, quantities) numpy arrays
+        """
+        symbol_id = self._symbol_ids.get(symbol)
+        capacity = len(self._trade_prices)
+        stored = min(self.total_trades, capacity)
+        if symbol_id is None or not stored:
+            return (np.empty(0, dtype=np.float64),
+                    np.empty(0, dtype=np.int64))
+
+        slots = np.flatnonzero(self._trade_symbols[:stored] == symbol_id)
+        if self.total_trades > capacity:
+            # The ring has wrapped: the oldest trade sits at the write slot
+            oldest = self.total_trades % capacity
+            slots = np.concatenate(
+                (slots[slots >= oldest], slots[slots < oldest]))
+        slots = slots[-count:]
+        return self._trade_prices[slots], self._trade_quantities[slots]
 
     def get_all_trades(self):
-        """Get all trades for export"""
-        with self.stats_lock:
-            return list(self.trade_history)
+        """Get all trades for export, as dictionaries"""
+        with self.orders_lock:
+            trades = list(self.trade_history)
+        return [trade.to_dict() for trade in trades]
 
     def get_performance_stats(self):
         """Get engine performance statistics"""
-        with self.stats_lock:
-            current_time = datetime.now()
-            runtime_seconds = (current_time - self.start_time).total_seconds()
+        return self._performance_stats()
+
+    def _performance_stats(self):
+        """
+        Build the performance statistics
 
-            # Calculate trades per second
-            trades_per_second = self.total_trades / max(1, runtime_seconds)
+        Counters are read once each without a lock, so they may be a trade
+        apart unless the caller holds the orders lock.
+        """
+        current_time = datetime.now()
+        runtime_seconds = (current_time - self.start_time).total_seconds()
+        total_trades = self.total_trades
+        total_volume = self.total_volume
+        latencies = self.get_recent_latencies()
 
-            # Calculate average latency
-            avg_latency_ms = 0
-            if self.latency_measurements:
-                avg_latency_ms = sum(self.latency_measurements) / len(
-                    self.latency_measurements)
+        # Calculate trades per second
+        trades_per_second = total_trades / max(1, runtime_seconds)
 
-            # Count active orders
-            active_orders_count = len(self.active_orders)
+        # Calculate average latency
+        avg_latency_ms = 0
+        if len(latencies):
+            avg_latency_ms = float(latencies.mean())
 
+        # Count active orders
+        active_orders_count = len(self.active_orders)
+
+        return {
+            'total_trades': total_trades,
+            'total_volume': total_volume,
+            'trades_per_second': trades_per_second,
+            'orders_per_second': self.orders_per_second,
+            'avg_latency_ms': avg_latency_ms,
+            'active_orders': active_orders_count,
+            'runtime_seconds': runtime_seconds,
+            'symbols_active': len(self.orderbooks)
+        }
+
+    def get_recent_latencies(self):
+        """
+        Get a copy of the recorded order latencies
+
+        Returns:
+            np.ndarray: Up to LATENCY_WINDOW latencies in ms, in ring order
+        """
+        stored = min(self.latency_count, self.LATENCY_WINDOW)
+        return self.latency_measurements[:stored].copy()
+
+    def snapshot(self, symbols, n_trades=20, depth=5):
+        """
+        Get everything the live dashboard shows in a single locked pass
+
+        Args:
+            symbols (list): Symbols whose books to include
+            n_trades (int): Number of most recent trades
+            depth (int): Price levels per book side
+
+        Returns:
+            dict: 'stats', 'trades' (rows as from get_recent_trades), 'books'
+                (symbol -> (bids, asks)) and the 'tick' the snapshot was
+                taken at
+        """
+        with self.orders_lock:
             return {
-                'total_trades': self.total_trades,
-                'total_volume': self.total_volume,
-                'trades_per_second': trades_per_second,
-                'orders_per_second': self.orders_per_second,
-                'avg_latency_ms': avg_latency_ms,
-                'active_orders': active_orders_count,
-                'runtime_seconds': runtime_seconds,
-                'symbols_active': len(self.orderbooks)
+                'stats': self._performance_stats(),
+                'trades': self._trade_rows(
+                    self._recent_trade_list(n_trades)),
+                'books': {
+                    symbol: self.get_orderbook(symbol).get_top_levels(depth)
+                    for symbol in symbols
+                },
+                'tick': self.tick
+            }
+
+    def snapshot_all(self, symbols):
+        """
+        Get order book snapshots for several symbols as of the same moment
+
+        The books are read in one pass under the orders lock, so no order is
+        matched between one symbol's snapshot and the next.
+
+        Args:
+            symbols (list): Symbols to include, those without a book are skipped
+
+        Returns:
+            dict: Symbol -> snapshot as from OrderBook.get_snapshot
+        """
+        with self.orders_lock:
+            return {
+                symbol: self.orderbooks[symbol].get_snapshot()
+                for symbol in symbols if symbol in self.orderbooks
             }
 
     def get_market_summary(self):
@@ -317,17 +551,10 @@ class TradingEngine:
 
         for symbol, orderbook in self.orderbooks.items():
             stats = orderbook.get_statistics()
-            recent_trades = orderbook.get_recent_trades(5)
-
-            # Calculate volume-weighted average price (VWAP) for recent trades
-            vwap = 0
-            if recent_trades:
-                total_value = sum(trade['price'] * trade['quantity']
-                                  for trade in recent_trades)
-                total_volume = sum(trade['quantity']
-                                   for trade in recent_trades)
-                if total_volume > 0:
-                    vwap = total_value / total_volume
+
+            # Volume-weighted average price (VWAP) of the recent trades,
+            # cached by the book between trades
+            vwap = orderbook.get_recent_vwap() or 0
 
             summary[symbol] = {
                 'best_bid': stats['mid_price'],
@@ -337,7 +564,8 @@ class TradingEngine:
                 'vwap': vwap,
                 'volume':
                 stats['total_bid_volume'] + stats['total_ask_volume'],
-                'trade_count': len(recent_trades)
+                'trade_count': min(orderbook.trade_count,
+                                   orderbook.VWAP_WINDOW)
             }
 
         return summary
@@ -350,25 +578,73 @@ class TradingEngine:
                 if order.trader_id == trader_id
             ]
 
+    def get_trader_stats(self, trader_ids=None):
+        """
+        Get per-trader account figures in one pass over the traders
+
+        The account figures are copied under the orders lock so no fill lands
+        halfway through, then valued outside it so the execution thread is
+        not held up by the pricing. The result is laid out column-wise for
+        direct use in a DataFrame.
+
+        Args:
+            trader_ids (list): Traders to include, defaults to all registered
+
+        Returns:
+            dict: Column name -> numpy array, one entry per trader
+        """
+        with self.orders_lock:
+            if trader_ids is None:
+                traders = list(self.traders.values())
+            else:
+                traders = [self.traders[trader_id] for trader_id in trader_ids
+                           if trader_id in self.traders]
+            accounts = [t.snapshot_account() for t in traders]
+            orders_sent = [t.orders_sent for t in traders]
+
+        count = len(traders)
+        cash = np.fromiter((account[0] for account in accounts),
+                           dtype=np.float64,
+                           count=count)
+        initial_cash = np.fromiter((t.initial_cash for t in traders),
+                                   dtype=np.float64,
+                                   count=count)
+        portfolio_value = np.fromiter(
+            (t.get_portfolio_value(account)
+             for t, account in zip(traders, accounts)),
+            dtype=np.float64,
+            count=count)
+
+        return {
+            'trader_id': np.array([t.trader_id for t in traders], dtype=object),
+            'cash': cash,
+            'portfolio_value': portfolio_value,
+            'pnl': portfolio_value - initial_cash,
+            'orders_sent': np.array(orders_sent, dtype=np.int64),
+            'orders_filled': np.fromiter(
+                (account[2] for account in accounts),
+                dtype=np.int64,
+                count=count)
+        }
+
     def get_symbol_statistics(self, symbol):
         """Get detailed statistics for a symbol"""
         if symbol not in self.orderbooks:
             return None
 
         orderbook = self.orderbooks[symbol]
-        recent_trades = self.get_recent_trades_for_symbol(symbol, 100)
+        with self.orders_lock:
+            prices, quantities = self._symbol_trade_columns(symbol, 100)
 
         # Calculate price statistics
-        if recent_trades:
-            prices = [trade['price'] for trade in recent_trades]
-            high_price = max(prices)
-            low_price = min(prices)
-            last_price = prices[-1] if prices else 0
+        total_volume = int(quantities.sum())
+        if prices.size:
+            high_price = float(prices.max())
+            low_price = float(prices.min())
+            last_price = float(prices[-1])
 
             # Calculate VWAP
-            total_value = sum(trade['price'] * trade['quantity']
-                              for trade in recent_trades)
-            total_volume = sum(trade['quantity'] for trade in recent_trades)
+            total_value = float(prices @ quantities)
             vwap = total_value / total_volume if total_volume > 0 else 0
         else:
             high_price = low_price = last_price = vwap = 0
@@ -379,7 +655,7 @@ class TradingEngine:
             'high_price': high_price,
             'low_price': low_price,
             'vwap': vwap,
-            'total_volume': sum(trade['quantity'] for trade in recent_trades),
-            'trade_count': len(recent_trades),
+            'total_volume': total_volume,
+            'trade_count': int(prices.size),
             'orderbook_stats': orderbook.get_statistics()
         }
@@ -1,6 +1,26 @@
 from datetime import datetime
 from enum import Enum
-import uuid
+import itertools
+import time
+
+# Prices are held as integer multiples of 1/TICK (hundredths of a cent), fine
+# enough that imported sub-cent prices keep their own level
+TICK = 10000
+
+
+def price_to_ticks(price):
+    """Convert a price to integer tick units"""
+    return int(round(price * TICK))
+
+
+# Offset from time.monotonic_ns() to Unix epoch nanoseconds, fixed at import
+# so monotonic stamps can be shown as wall-clock times
+_MONOTONIC_TO_EPOCH_NS = time.time_ns() - time.monotonic_ns()
+
+
+def monotonic_ns_to_datetime(timestamp_ns):
+    """Convert a time.monotonic_ns() stamp to a local datetime"""
+    return datetime.fromtimestamp((timestamp_ns + _MONOTONIC_TO_EPOCH_NS) / 1e9)
 
 class OrderSide(Enum):
     """Enumeration for order sides"""
@@ -19,6 +39,15 @@ class Order:
     Represents a trading order in the system
     """
     
+    # Fixed attribute layout: no per-instance __dict__, smaller orders and
+    # cheaper attribute access on the matching path
+    __slots__ = ('order_id', 'trader_id', 'symbol', 'side', 'quantity',
+                 'original_quantity', 'price_ticks', 'status', 'timestamp_ns',
+                 'fills', 'filled_quantity', 'filled_value', 'submit_time')
+    
+    # Process-wide order id sequence; ids are only used as in-process keys
+    _ids = itertools.count(1)
+    
     def __init__(self, trader_id, symbol, side, quantity, price):
         """
         Initialize a new order
@@ -30,16 +59,35 @@ class Order:
             quantity (int): Number of shares
             price (float): Price per share
         """
-        self.order_id = str(uuid.uuid4())
+        self.order_id = next(Order._ids)
         self.trader_id = trader_id
         self.symbol = symbol
         self.side = side
         self.quantity = quantity
         self.original_quantity = quantity
-        self.price = price
+        self.price_ticks = price_to_ticks(price)
         self.status = OrderStatus.PENDING
-        self.timestamp = datetime.now()
-        self.fills = []  # List of partial fills
+        self.timestamp_ns = time.monotonic_ns()
+        self.fills = []  # (quantity, price, monotonic ns) per partial fill
+        # Running totals over the fills
+        self.filled_quantity = 0
+        self.filled_value = 0.0
+    
+    @property
+    def price(self):
+        """Price per share"""
+        return self.price_ticks / TICK
+    
+    @property
+    def timestamp(self):
+        """Order creation time as a datetime"""
+        return monotonic_ns_to_datetime(self.timestamp_ns)
+    
+    @timestamp.setter
+    def timestamp(self, value):
+        if hasattr(value, 'to_pydatetime'):
+            value = value.to_pydatetime()
+        self.timestamp_ns = int(value.timestamp() * 1e9) - _MONOTONIC_TO_EPOCH_NS
     
     def fill(self, quantity, price):
         """
@@ -53,12 +101,9 @@ class Order:
             raise ValueError("Fill quantity exceeds remaining order quantity")
         
         # Record the fill
-        fill = {
-            'quantity': quantity,
-            'price': price,
-            'timestamp': datetime.now()
-        }
-        self.fills.append(fill)
+        self.fills.append((quantity, price, time.monotonic_ns()))
+        self.filled_quantity += quantity
+        self.filled_value += quantity * price
         
         # Update remaining quantity
         self.quantity -= quantity
@@ -76,17 +121,14 @@ class Order:
     
     def get_filled_quantity(self):
         """Get total filled quantity"""
-        return sum(fill['quantity'] for fill in self.fills)
+        return self.filled_quantity
     
     def get_average_fill_price(self):
         """Get average fill price"""
-        if not self.fills:
+        if self.filled_quantity <= 0:
             return 0.0
         
-        total_value = sum(fill['quantity'] * fill['price'] for fill in self.fills)
-        total_quantity = sum(fill['quantity'] for fill in self.fills)
-        
-        return total_value / total_quantity if total_quantity > 0 else 0.0
+        return self.filled_value / self.filled_quantity
     
     def is_complete(self):
         """Check if order is completely filled"""
@@ -97,7 +139,7 @@ class Order:
         return self.status in [OrderStatus.PENDING, OrderStatus.PARTIALLY_FILLED]
     
     def __str__(self):
-        return (f"Order({self.order_id[:8]}, {self.trader_id}, "
+        return (f"Order({self.order_id:08x}, {self.trader_id}, "
                 f"{self.symbol}, {self.side.value}, "
                 f"{self.quantity}@{self.price:.2f})")
     
@@ -116,5 +158,9 @@ class Order:
             'price': self.price,
             'status': self.status.value,
             'timestamp': self.timestamp,
-            'fills': self.fills
+            'fills': [{
+                'quantity': quantity,
+                'price': price,
+                'timestamp': monotonic_ns_to_datetime(timestamp_ns)
+            } for quantity, price, timestamp_ns in self.fills]
         }
@@ -1,9 +1,55 @@
-import heapq
-from collections import defaultdict, deque
+from collections import defaultdict, deque, namedtuple
 from datetime import datetime
+from itertools import accumulate, islice
+import operator
 import threading
 
-from models.order import Order, OrderSide, OrderStatus
+from sortedcontainers import SortedDict
+
+from models.order import TICK, Order, OrderSide, OrderStatus, price_to_ticks
+
+# Aggregated view of one price level, as returned by get_top_levels
+Level = namedtuple('Level', 'price quantity order_count')
+# One price level with the volume available up to and including it
+DepthLevel = namedtuple('DepthLevel', 'price quantity cumulative_volume')
+
+class PriceLevel:
+    """
+    Orders resting at a single price, in arrival order
+    """
+    
+    def __init__(self, price_ticks):
+        """
+        Initialize an empty price level
+        
+        Args:
+            price_ticks (int): Price of every order at this level, in ticks
+        """
+        self.price_ticks = price_ticks
+        self.price = price_ticks / TICK
+        # Dicts keep insertion order, so this is a FIFO queue that can also
+        # drop any order by id in O(1)
+        self.orders = {}  # order_id -> order
+        self.volume = 0  # Remaining quantity across the orders
+    
+    def __len__(self):
+        return len(self.orders)
+    
+    def append(self, order):
+        """Queue an order at the back of the level"""
+        self.orders[order.order_id] = order
+        self.volume += order.quantity
+    
+    def remove(self, order):
+        """Take an order out of the level, returning False if absent"""
+        if self.orders.pop(order.order_id, None) is None:
+            return False
+        self.volume -= order.quantity
+        return True
+    
+    def first(self):
+        """Get the oldest order at this level"""
+        return next(iter(self.orders.values()))
 
 class OrderBookSide:
     """
@@ -18,28 +64,66 @@ class OrderBookSide:
             is_bid_side (bool): True for bid side (buy orders), False for ask side (sell orders)
         """
         self.is_bid_side = is_bid_side
-        self.price_levels = {}  # price -> list of orders
-        self.price_heap = []  # Priority queue for prices
+        # Prices compare as price * sign, so the best level sorts first on
+        # both sides and no other method needs to branch on the side
+        self._sign = -1 if is_bid_side else 1
+        # price ticks -> PriceLevel, best price first
+        self.price_levels = SortedDict(operator.neg if is_bid_side else None)
         self.orders = {}  # order_id -> order mapping
-        self.lock = threading.Lock()
+        # Resting quantity for the whole side, kept in step with adds, fills
+        # and removals so volume reads are O(1)
+        self.total_volume = 0
+        # Best price, maintained on add/remove so reads never search, as a
+        # (ticks, price) pair: the tick value keys the levels, the float is
+        # what readers get. The pair is replaced whole, so a reader without
+        # the lock never sees the ticks of one best and the price of another
+        self.best = (None, None)
+        # Writers hold the lock and bump the version before and after each
+        # mutation, so it is odd while a write is in progress. Readers run
+        # without the lock and retry under it if the version moved.
+        self.lock = threading.RLock()
+        self._version = 0
+    
+    def _optimistic_read(self, compute):
+        """
+        Run a read-only computation, locking only if it raced a writer
+        
+        Args:
+            compute (callable): Reads this side and returns the result
+        """
+        version = self._version
+        if not version & 1:
+            try:
+                result = compute()
+            except (RuntimeError, KeyError, IndexError, ValueError):
+                # Structures changed size mid-read; fall through to the lock
+                pass
+            else:
+                if self._version == version:
+                    return result
+        with self.lock:
+            return compute()
     
     def add_order(self, order):
         """Add an order to this side of the book"""
         with self.lock:
-            price = order.price
-            
-            # Add to price level
-            if price not in self.price_levels:
-                self.price_levels[price] = deque()
-                # For bids: higher prices have higher priority (max heap)
-                # For asks: lower prices have higher priority (min heap)
-                if self.is_bid_side:
-                    heapq.heappush(self.price_heap, -price)  # Negative for max heap
-                else:
-                    heapq.heappush(self.price_heap, price)   # Positive for min heap
-            
-            self.price_levels[price].append(order)
-            self.orders[order.order_id] = order
+            self._version += 1
+            try:
+                ticks = order.price_ticks
+                
+                # Add to price level
+                level = self.price_levels.get(ticks)
+                if level is None:
+                    level = self.price_levels[ticks] = PriceLevel(ticks)
+                    best = self.best[0]
+                    if best is None or ticks * self._sign < best * self._sign:
+                        self._set_best(ticks)
+                
+                level.append(order)
+                self.orders[order.order_id] = order
+                self.total_volume += order.quantity
+            finally:
+                self._version += 1
     
     def remove_order(self, order_id):
         """Remove an order from this side of the book"""
@@ -47,100 +131,117 @@ class OrderBookSide:
             if order_id not in self.orders:
                 return False
             
-            order = self.orders[order_id]
-            price = order.price
-            
-            # Remove from price level
-            if price in self.price_levels:
+            self._version += 1
+            try:
+                self._unlink(self.orders[order_id])
+                return True
+            finally:
+                self._version += 1
+    
+    def _unlink(self, order):
+        """Drop an order from its level and the id map, caller holds the lock"""
+        ticks = order.price_ticks
+        
+        # Remove from price level
+        level = self.price_levels.get(ticks)
+        if level is not None and level.remove(order):
+            if not level:
+                # Remove empty price level
+                del self.price_levels[ticks]
+                if ticks == self.best[0]:
+                    self._set_best(self._end_ticks())
+            self.total_volume -= order.quantity
+        
+        # Remove from orders mapping
+        del self.orders[order.order_id]
+    
+    def on_fill(self, order, quantity):
+        """
+        Account for a fill against a resting order on this side
+        
+        A fully filled order leaves the book here, in the same write, so
+        readers never see a level holding only empty orders.
+        
+        Args:
+            order (Order): The resting order that was filled
+            quantity (int): Quantity filled
+        """
+        with self.lock:
+            if order.order_id in self.orders:
+                self._version += 1
                 try:
-                    self.price_levels[price].remove(order)
-                    if not self.price_levels[price]:
-                        # Remove empty price level
-                        del self.price_levels[price]
-                        # Note: We don't remove from heap for efficiency
-                        # The heap cleanup happens in get_best_price()
-                except ValueError:
-                    pass  # Order not in deque
-            
-            # Remove from orders mapping
-            del self.orders[order_id]
-            return True
+                    self.price_levels[order.price_ticks].volume -= quantity
+                    self.total_volume -= quantity
+                    if order.quantity == 0:
+                        self._unlink(order)
+                finally:
+                    self._version += 1
+    
+    def _set_best(self, ticks):
+        """Record a new best price, caller holds the lock"""
+        self.best = (ticks, None if ticks is None else ticks / TICK)
+    
+    def _end_ticks(self):
+        """Search the levels for the best price, caller holds the lock"""
+        if not self.price_levels:
+            return None
+        # Empty levels are deleted on removal, so the first key is live
+        return self.price_levels.keys()[0]
     
     def get_best_price(self):
         """Get the best price on this side"""
-        with self.lock:
-            # Clean up heap - remove prices that no longer have orders
-            while self.price_heap:
-                if self.is_bid_side:
-                    price = -self.price_heap[0]  # Convert back from negative
-                else:
-                    price = self.price_heap[0]
-                
-                if price in self.price_levels and self.price_levels[price]:
-                    return price
-                else:
-                    heapq.heappop(self.price_heap)
-            
-            return None
+        return self.best[1]
     
     def get_best_order(self):
         """Get the best order (first order at best price)"""
         with self.lock:
-            best_price = self.get_best_price()
-            if best_price and best_price in self.price_levels:
-                if self.price_levels[best_price]:
-                    return self.price_levels[best_price][0]
+            level = self.price_levels.get(self.best[0])
+            if level:
+                return level.first()
             return None
     
     def get_orders_at_price(self, price):
         """Get all orders at a specific price level"""
-        with self.lock:
-            return list(self.price_levels.get(price, []))
+        ticks = price_to_ticks(price)
+        
+        def compute():
+            level = self.price_levels.get(ticks)
+            return list(level.orders.values()) if level is not None else []
+        
+        return self._optimistic_read(compute)
     
     def get_top_levels(self, num_levels):
-        """Get top N price levels with their orders"""
-        with self.lock:
-            levels = []
-            prices_seen = set()
-            
-            # Create a copy of heap for iteration
-            heap_copy = self.price_heap[:]
-            
-            while heap_copy and len(levels) < num_levels:
-                if self.is_bid_side:
-                    price = -heapq.heappop(heap_copy)
-                else:
-                    price = heapq.heappop(heap_copy)
-                
-                if price in prices_seen:
-                    continue
-                    
-                prices_seen.add(price)
-                
-                if price in self.price_levels and self.price_levels[price]:
-                    # Aggregate orders at this price level
-                    orders = list(self.price_levels[price])
-                    total_quantity = sum(order.quantity for order in orders)
-                    
-                    levels.append({
-                        'price': price,
-                        'quantity': total_quantity,
-                        'order_count': len(orders),
-                        'orders': orders
-                    })
-            
-            return levels
+        """
+        Get top N price levels as aggregates
+        
+        Levels carry price, quantity and order count only; the orders
+        themselves are available from get_orders_at_price.
+        """
+        def compute():
+            return [
+                Level(level.price, level.volume, len(level))
+                for level in islice(self.price_levels.values(), num_levels)
+            ]
+        
+        return self._optimistic_read(compute)
+    
+    def get_volume_at_price(self, price):
+        """Get resting volume at a specific price level"""
+        level = self.price_levels.get(price_to_ticks(price))
+        return level.volume if level is not None else 0
     
     def get_total_volume(self):
         """Get total volume on this side"""
-        with self.lock:
-            return sum(order.quantity for order in self.orders.values())
+        return self.total_volume
 
 class OrderBook:
     """
     Complete order book for a trading symbol
     """
     
+    # Number of most recent trades the recent VWAP is taken over
+    VWAP_WINDOW = 5
+    
     def __init__(self, symbol):
         """
         Initialize order book for a symbol
@@ -152,6 +253,9 @@ class OrderBook:
         self.bids = OrderBookSide(is_bid_side=True)   # Buy orders
         self.asks = OrderBookSide(is_bid_side=False)  # Sell orders
         self.trade_history = deque(maxlen=1000)  # Recent trades
+        self.trade_count = 0  # Trades ever added; versions trade-derived caches
+        self._vwap = None
+        self._vwap_trade_count = 0  # trade_count _vwap was computed at
         self.lock = threading.Lock()
     
     def add_order(self, order):
@@ -171,6 +275,13 @@ class OrderBook:
         else:
             return self.asks.remove_order(order_id)
     
+    def on_fill(self, order, quantity):
+        """Account for a fill against a resting order"""
+        if order.side == OrderSide.BUY:
+            self.bids.on_fill(order, quantity)
+        else:
+            self.asks.on_fill(order, quantity)
+    
     def get_best_bid(self):
         """Get the best bid order"""
         return self.bids.get_best_order()
@@ -210,7 +321,7 @@ class OrderBook:
         Get top N levels from both sides of the book
         
         Returns:
-            tuple: (bids, asks) where each is a list of price level dictionaries
+            tuple: (bids, asks) where each is a list of Level tuples, best first
         """
         bids = self.bids.get_top_levels(num_levels)
         asks = self.asks.get_top_levels(num_levels)
@@ -220,62 +331,90 @@ class OrderBook:
         """Add a trade to the history"""
         with self.lock:
             self.trade_history.append(trade)
+            self.trade_count += 1
     
     def get_recent_trades(self, count=10):
-        """Get recent trades"""
+        """Get recent trades, oldest first"""
         with self.lock:
-            return list(self.trade_history)[-count:]
+            if count <= 0:
+                return list(self.trade_history)
+            # Walk back from the newest trade instead of copying the history
+            recent = list(islice(reversed(self.trade_history), count))
+        recent.reverse()
+        return recent
+    
+    def get_recent_vwap(self):
+        """
+        Get the volume-weighted average price of the most recent trades
+        
+        The average is recomputed only once new trades have arrived, so
+        reads between trades cost a single comparison.
+        
+        Returns:
+            float: VWAP of the last VWAP_WINDOW trades, None without trades
+        """
+        with self.lock:
+            if self._vwap_trade_count != self.trade_count:
+                recent = list(islice(reversed(self.trade_history),
+                                     self.VWAP_WINDOW))
+                total_value = total_volume = 0
+                for trade in reversed(recent):
+                    total_value += trade.price * trade.quantity
+                    total_volume += trade.quantity
+                self._vwap = (total_value / total_volume
+                              if total_volume > 0 else None)
+                self._vwap_trade_count = self.trade_count
+            return self._vwap
     
     def get_volume_at_price(self, price, side):
         """Get total volume at a specific price"""
         if side == OrderSide.BUY:
-            orders = self.bids.get_orders_at_price(price)
+            return self.bids.get_volume_at_price(price)
         else:
-            orders = self.asks.get_orders_at_price(price)
-        
-        return sum(order.quantity for order in orders)
+            return self.asks.get_volume_at_price(price)
     
     def get_market_depth(self, max_levels=10):
-        """Get market depth (cumulative volume at each price level)"""
-        bids, asks = self.get_top_levels(max_levels)
-        
-        # Calculate cumulative volumes
-        bid_depth = []
-        ask_depth = []
-        
-        cumulative_bid_volume = 0
-        for level in bids:
-            cumulative_bid_volume += level['quantity']
-            bid_depth.append({
-                'price': level['price'],
-                'quantity': level['quantity'],
-                'cumulative_volume': cumulative_bid_volume
-            })
-        
-        cumulative_ask_volume = 0
-        for level in asks:
-            cumulative_ask_volume += level['quantity']
-            ask_depth.append({
-                'price': level['price'],
-                'quantity': level['quantity'],
-                'cumulative_volume': cumulative_ask_volume
-            })
+        """
+        Get market depth (cumulative volume at each price level)
         
-        return bid_depth, ask_depth
+        Returns:
+            tuple: (bids, asks) where each is a list of DepthLevel tuples
+        """
+        bids, asks = self.get_top_levels(max_levels)
+        return self._depth(bids), self._depth(asks)
+    
+    @staticmethod
+    def _depth(levels):
+        """Attach running volume totals to best-first levels"""
+        # Levels come best-first, so a prefix sum over quantities is the depth
+        cumulative = accumulate(level.quantity for level in levels)
+        return [
+            DepthLevel(level.price, level.quantity, cumulative_volume)
+            for level, cumulative_volume in zip(levels, cumulative)
+        ]
     
     def get_snapshot(self):
         """Get a complete snapshot of the order book"""
         bids, asks = self.get_top_levels(10)
         
+        # Best prices come from the levels just read, so the summary fields
+        # always agree with them and the sides are only read once
+        best_bid = bids[0].price if bids else None
+        best_ask = asks[0].price if asks else None
+        spread = mid_price = None
+        if best_bid is not None and best_ask is not None:
+            spread = best_ask - best_bid
+            mid_price = (best_bid + best_ask) / 2
+        
         return {
             'symbol': self.symbol,
             'timestamp': datetime.now(),
             'bids': bids,
             'asks': asks,
-            'best_bid': self.get_best_bid_price(),
-            'best_ask': self.get_best_ask_price(),
-            'spread': self.get_spread(),
-            'mid_price': self.get_mid_price()
+            'best_bid': best_bid,
+            'best_ask': best_ask,
+            'spread': spread,
+            'mid_price': mid_price
         }
     
     def is_crossed(self):
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+
+class Trade:
+    """
+    Represents an execution between a buy order and a sell order
+    """
+    
+    # Fixed attribute layout, as for Order: one trade is created per fill
+    __slots__ = ('trade_id', 'timestamp_ns', 'symbol', 'quantity', 'price',
+                 'buyer_id', 'seller_id', 'buy_order_id', 'sell_order_id',
+                 'side')
+    
+    def __init__(self, trade_id, timestamp_ns, symbol, quantity, price,
+                 buyer_id, seller_id, buy_order_id, sell_order_id, side='BUY'):
+        """
+        Initialize a trade
+        
+        Args:
+            trade_id (int): Sequential trade number
+            timestamp_ns (int): Execution time from time.time_ns()
+            symbol (str): Trading symbol
+            quantity (int): Number of shares traded
+            price (float): Execution price per share
+            buyer_id (str): ID of the buying trader
+            seller_id (str): ID of the selling trader
+            buy_order_id (int): ID of the buy order
+            sell_order_id (int): ID of the sell order
+            side (str): Side of the aggressive order
+        """
+        self.trade_id = trade_id
+        self.timestamp_ns = timestamp_ns
+        self.symbol = symbol
+        self.quantity = quantity
+        self.price = price
+        self.buyer_id = buyer_id
+        self.seller_id = seller_id
+        self.buy_order_id = buy_order_id
+        self.sell_order_id = sell_order_id
+        self.side = side
+    
+    @property
+    def timestamp(self):
+        """Execution time as a datetime"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+    
+    def __repr__(self):
+        return (f"Trade({self.trade_id:06d}, {self.symbol}, "
+                f"{self.quantity}@{self.price:.2f}, "
+                f"{self.buyer_id}<-{self.seller_id})")
+    
+    def to_dict(self):
+        """Convert trade to dictionary for serialization"""
+        return {
+            'trade_id': f"{self.trade_id:06d}",
+            'timestamp': self.timestamp,
+            'symbol': self.symbol,
+            'quantity': self.quantity,
+            'price': self.price,
+            'buyer_id': self.buyer_id,
+            'seller_id': self.seller_id,
+            'buy_order_id': self.buy_order_id,
+            'sell_order_id': self.sell_order_id,
+            'side': self.side
+        }
@@ -1,6 +1,8 @@
+import asyncio
+from collections import deque
 import random
-import time
 import threading
+import time
 from datetime import datetime
 import numpy as np
 
@@ -11,6 +13,20 @@ class Trader:
     Simulated trading bot that generates orders
     """
     
+    # Random order parameters are drawn this many orders at a time
+    RANDOM_BATCH = 4096
+    # A market price estimate is reused for this long before it is refreshed
+    MARKET_PRICE_TTL_NS = 50_000_000  # 50ms
+    # Orders waiting for the engine; new orders are dropped while it is full
+    ORDER_RING_SIZE = 4096
+    
+    # Trading parameters (optimized for HFT). Class-level defaults, so a
+    # subclass can retune them and a single bot can still override them
+    min_order_size = 10
+    max_order_size = 100
+    price_volatility = 0.02  # 2% price variation
+    order_frequency = 0.1  # 100ms between orders for HFT speed
+    
     def __init__(self, trader_id, initial_cash, symbols, engine):
         """
         Initialize a trading bot
@@ -27,76 +43,123 @@ class Trader:
         self.symbols = symbols
         self.engine = engine
         
-        # Portfolio tracking
-        self.positions = {symbol: 0 for symbol in symbols}  # Share positions
-        self.average_costs = {symbol: 0.0 for symbol in symbols}  # Average cost basis
+        # Portfolio tracking, one array slot per symbol
+        self._symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        self._positions = np.zeros(len(symbols), dtype=np.int64)  # Share positions
+        self._average_costs = np.zeros(len(symbols), dtype=np.float64)  # Average cost basis
         
         # Trading statistics
         self.orders_sent = 0
         self.orders_filled = 0
+        self.orders_dropped = 0  # Generated while the order ring was full
         self.total_volume = 0
         
-        # Trading parameters (optimized for HFT)
-        self.min_order_size = 10
-        self.max_order_size = 100
-        self.price_volatility = 0.02  # 2% price variation
-        self.order_frequency = 0.1  # 100ms between orders for HFT speed
         self.market_price_cache = {symbol: 100.0 for symbol in symbols}  # Starting prices
+        self._price_trade_count = {}  # symbol -> book trade_count behind the cached price
+        self._price_refreshed_ns = {}  # symbol -> time.monotonic_ns() of last refresh
+        # Last portfolio valuation and the (own fills, held books' trade counts,
+        # book version) it was made at
+        self._portfolio_value = None
+        self._portfolio_value_key = None
         
-        # Threading
+        # Outgoing orders: this trader appends, the engine it is registered
+        # with pops from its execution thread (single producer, single consumer)
+        self.order_ring = deque(maxlen=self.ORDER_RING_SIZE)
+        
+        # Scheduling (driven by a TraderPool event loop)
         self.is_active = False
-        self.trade_thread = None
+        self.next_order_at = 0.0  # time.monotonic() deadline for next order
+        
+        # Pre-drawn random parameters, one entry per future order
+        self._rng = np.random.default_rng()
+        self._draw_index = self.RANDOM_BATCH  # Forces a draw on first use
+    
+    @property
+    def positions(self):
+        """Share positions by symbol (a copy)"""
+        return dict(zip(self.symbols, self._positions.tolist()))
+    
+    @property
+    def average_costs(self):
+        """Average cost basis by symbol (a copy)"""
+        return dict(zip(self.symbols, self._average_costs.tolist()))
+    
+    def _position(self, symbol):
+        """Current share position in one symbol"""
+        return int(self._positions[self._symbol_index[symbol]])
     
     def start_trading(self):
-        """Start the trading bot in a separate thread"""
+        """Mark the bot active; a TraderPool task sends its orders"""
+        if self.engine.traders.get(self.trader_id) is not self:
+            # Nothing would ever drain the order ring
+            raise RuntimeError(
+                f"Trader {self.trader_id} is not registered with its engine")
         if not self.is_active:
             self.is_active = True
-            self.trade_thread = threading.Thread(target=self._trading_loop, daemon=True)
-            self.trade_thread.start()
+            self.next_order_at = time.monotonic() + self._rng.exponential(self.order_frequency)
     
     def stop_trading(self):
         """Stop the trading bot"""
         self.is_active = False
-        if self.trade_thread and self.trade_thread.is_alive():
-            self.trade_thread.join(timeout=1.0)
-    
-    def _trading_loop(self):
-        """Main trading loop that runs in a separate thread"""
-        while self.is_active:
-            try:
-                # Random delay between orders
-                delay = np.random.exponential(self.order_frequency)
-                time.sleep(delay)
-                
-                if not self.is_active:
-                    break
-                
-                # Generate a random order
-                self._generate_order()
-                
-            except Exception as e:
-                print(f"Error in trading loop for {self.trader_id}: {e}")
-                time.sleep(1)  # Brief pause on error
-    
-    def _generate_order(self):
-        """Generate and submit a random order"""
+    
+    def _refill_random(self):
+        """Draw the random parameters for the next batch of orders at once"""
+        n = self.RANDOM_BATCH
+        rng = self._rng
+        # Stored as lists: indexing them yields plain Python numbers
+        self._delay_draws = rng.exponential(self.order_frequency, n).tolist()
+        self._symbol_draws = rng.integers(0, max(1, len(self.symbols)), n).tolist()
+        self._side_draws = rng.random(n).tolist()
+        self._quantity_draws = rng.integers(self.min_order_size,
+                                            self.max_order_size + 1, n).tolist()
+        self._variation_draws = rng.normal(0, self.price_volatility, n).tolist()
+        self._draw_index = 0
+    
+    def _next_draw(self):
+        """Index of the next unused set of pre-drawn parameters"""
+        if self._draw_index >= self.RANDOM_BATCH:
+            self._refill_random()
+        i = self._draw_index
+        self._draw_index = i + 1
+        return i
+    
+    def step(self):
+        """Send one order and schedule the next one"""
+        try:
+            draw = self._next_draw()
+            # Generate a random order
+            self._generate_order(draw)
+            # Random delay between orders
+            delay = self._delay_draws[draw]
+        except Exception as e:
+            print(f"Error in trading loop for {self.trader_id}: {e}")
+            delay = 1.0  # Brief pause on error
+        self.next_order_at = time.monotonic() + delay
+    
+    def _generate_order(self, draw):
+        """
+        Generate and submit a random order
+        
+        Args:
+            draw (int): Index into the pre-drawn random parameters
+        """
         if not self.symbols:
             return
         
         # Choose random symbol
-        symbol = random.choice(self.symbols)
+        symbol = self.symbols[self._symbol_draws[draw]]
         
         # Get current market price estimate
         market_price = self._estimate_market_price(symbol)
         
         # Decide order side (buy/sell) with some bias based on position
-        side = self._decide_order_side(symbol)
+        side = self._decide_order_side(symbol, self._side_draws[draw])
         
         # Generate order parameters
-        quantity = random.randint(self.min_order_size, self.max_order_size)
+        quantity = self._quantity_draws[draw]
         
         # Generate price with some randomness around market price
-        price_variation = random.gauss(0, self.price_volatility)
+        price_variation = self._variation_draws[draw]
         
         if side == OrderSide.BUY:
             # Buyers typically bid below market price
@@ -117,30 +180,54 @@ class Trader:
             quantity = affordable_quantity
         
         # Check if we have enough shares to sell
-        if side == OrderSide.SELL and quantity > self.positions[symbol]:
-            if self.positions[symbol] < self.min_order_size:
-                return  # Not enough shares to sell
-            quantity = self.positions[symbol]
+        if side == OrderSide.SELL:
+            position = self._position(symbol)
+            if quantity > position:
+                if position < self.min_order_size:
+                    return  # Not enough shares to sell
+                quantity = position
         
         # Create and submit order
         order = Order(self.trader_id, symbol, side, quantity, price)
-        self.engine.submit_order(order)
+        order.submit_time = time.time()
+        order_ring = self.order_ring
+        if len(order_ring) >= order_ring.maxlen:
+            # The engine is behind: drop the new order rather than an
+            # older queued one
+            self.orders_dropped += 1
+            return
+        order_ring.append(order)
         self.orders_sent += 1
     
-    def _estimate_market_price(self, symbol):
-        """Estimate current market price based on recent trades and order book"""
-        # Get recent trades for price discovery
-        recent_trades = self.engine.get_recent_trades_for_symbol(symbol, 5)
-        
-        if recent_trades:
-            # Use volume-weighted average of recent trades
-            total_value = sum(trade['price'] * trade['quantity'] for trade in recent_trades)
-            total_volume = sum(trade['quantity'] for trade in recent_trades)
-            if total_volume > 0:
-                self.market_price_cache[symbol] = total_value / total_volume
+    def _estimate_market_price(self, symbol, refresh=False):
+        """
+        Estimate current market price based on recent trades and order book
+        
+        Args:
+            symbol (str): Trading symbol
+            refresh (bool): Re-estimate even if the cached price is within
+                MARKET_PRICE_TTL_NS
+        """
+        now_ns = time.monotonic_ns()
+        refreshed_ns = self._price_refreshed_ns.get(symbol)
+        if (not refresh and refreshed_ns is not None
+                and now_ns - refreshed_ns < self.MARKET_PRICE_TTL_NS):
+            return self.market_price_cache[symbol]
+        self._price_refreshed_ns[symbol] = now_ns
+        
+        orderbook = self.engine.get_orderbook(symbol)
+        trade_count = orderbook.trade_count
+        
+        if trade_count:
+            # The trade-based price only changes when the symbol trades
+            if self._price_trade_count.get(symbol) != trade_count:
+                # Use volume-weighted average of recent trades
+                vwap = orderbook.get_recent_vwap()
+                if vwap is not None:
+                    self.market_price_cache[symbol] = vwap
+                self._price_trade_count[symbol] = trade_count
         else:
             # If no recent trades, use order book mid-price or random walk
-            orderbook = self.engine.get_orderbook(symbol)
             best_bid = orderbook.get_best_bid()
             best_ask = orderbook.get_best_ask()
             
@@ -154,19 +241,25 @@ class Trader:
         
         return self.market_price_cache[symbol]
     
-    def _decide_order_side(self, symbol):
-        """Decide whether to buy or sell based on current position and market conditions"""
-        position = self.positions[symbol]
+    def _decide_order_side(self, symbol, u):
+        """
+        Decide whether to buy or sell based on current position and market conditions
+        
+        Args:
+            symbol (str): Symbol being traded
+            u (float): Uniform random draw in [0, 1)
+        """
+        position = self._position(symbol)
         
         # If we have a large position, bias toward selling
         if position > 500:
-            return OrderSide.SELL if random.random() < 0.7 else OrderSide.BUY
+            return OrderSide.SELL if u < 0.7 else OrderSide.BUY
         # If we have no position, bias toward buying
         elif position == 0:
-            return OrderSide.BUY if random.random() < 0.7 else OrderSide.SELL
+            return OrderSide.BUY if u < 0.7 else OrderSide.SELL
         # Otherwise, random
         else:
-            return random.choice([OrderSide.BUY, OrderSide.SELL])
+            return OrderSide.BUY if u < 0.5 else OrderSide.SELL
     
     def on_order_filled(self, order, fill_quantity, fill_price):
         """
@@ -177,7 +270,7 @@ class Trader:
             fill_quantity: Quantity filled
             fill_price: Price of the fill
         """
-        symbol = order.symbol
+        i = self._symbol_index[order.symbol]
         
         if order.side == OrderSide.BUY:
             # Update cash and position
@@ -185,38 +278,81 @@ class Trader:
             self.cash -= cost
             
             # Update average cost basis
-            old_position = self.positions[symbol]
-            old_cost_basis = self.average_costs[symbol] * old_position
+            old_position = int(self._positions[i])
+            old_cost_basis = float(self._average_costs[i]) * old_position
             new_cost_basis = old_cost_basis + cost
             new_position = old_position + fill_quantity
             
-            self.positions[symbol] = new_position
+            self._positions[i] = new_position
             if new_position > 0:
-                self.average_costs[symbol] = new_cost_basis / new_position
+                self._average_costs[i] = new_cost_basis / new_position
             
         else:  # SELL
             # Update cash and position
             proceeds = fill_quantity * fill_price
             self.cash += proceeds
-            self.positions[symbol] -= fill_quantity
+            self._positions[i] -= fill_quantity
             
             # If position goes to zero, reset average cost
-            if self.positions[symbol] == 0:
-                self.average_costs[symbol] = 0.0
+            if self._positions[i] == 0:
+                self._average_costs[i] = 0.0
         
         self.orders_filled += 1
         self.total_volume += fill_quantity
     
-    def get_portfolio_value(self):
-        """Calculate current portfolio value based on market prices"""
-        portfolio_value = self.cash
+    def snapshot_account(self):
+        """
+        Copy the figures this trader's fills change, for valuing later
+        
+        The engine takes the copy under its orders lock, so no fill lands
+        halfway through it.
+        
+        Returns:
+            tuple: (cash, positions array, orders_filled)
+        """
+        return self.cash, self._positions.copy(), self.orders_filled
+    
+    def get_portfolio_value(self, account=None):
+        """
+        Calculate current portfolio value based on market prices
+        
+        Cash and positions only move on this trader's fills, and held
+        symbols are priced from their own trades, so the value is reused
+        until this trader fills or a held symbol trades. A held symbol with
+        no trades yet is priced from its book, so then any book change
+        invalidates the value too.
+        
+        Args:
+            account (tuple): Figures from snapshot_account to value, defaults
+                to the live ones
+        """
+        if account is None:
+            account = (self.cash, self._positions, self.orders_filled)
+        cash, positions, orders_filled = account
+        
+        held = np.flatnonzero(positions > 0)
+        trade_counts = tuple(self.engine.get_orderbook(self.symbols[i]).trade_count
+                             for i in held)
+        book_version = self.engine.tick if 0 in trade_counts else None
+        key = (orders_filled, trade_counts, book_version)
+        if key == self._portfolio_value_key:
+            return self._portfolio_value
         
-        for symbol, position in self.positions.items():
-            if position > 0:
-                market_price = self._estimate_market_price(symbol)
-                portfolio_value += position * market_price
+        if not held.size:
+            value = cash
+        else:
+            # Bypass the price TTL: a price cached just before the key
+            # changed would otherwise be stored under the new key
+            market_prices = np.fromiter(
+                (self._estimate_market_price(self.symbols[i], refresh=True)
+                 for i in held),
+                dtype=np.float64,
+                count=held.size)
+            value = cash + float(positions[held] @ market_prices)
         
-        return portfolio_value
+        self._portfolio_value = value
+        self._portfolio_value_key = key
+        return value
     
     def get_total_pnl(self):
         """Calculate total profit/loss"""
@@ -224,13 +360,14 @@ class Trader:
     
     def get_position_pnl(self, symbol):
         """Calculate P&L for a specific position"""
-        position = self.positions[symbol]
+        i = self._symbol_index[symbol]
+        position = int(self._positions[i])
         if position == 0:
             return 0.0
         
         market_price = self._estimate_market_price(symbol)
         market_value = position * market_price
-        cost_basis = position * self.average_costs[symbol]
+        cost_basis = position * float(self._average_costs[i])
         
         return market_value - cost_basis
     
@@ -243,7 +380,92 @@ class Trader:
             'total_pnl': self.get_total_pnl(),
             'orders_sent': self.orders_sent,
             'orders_filled': self.orders_filled,
+            'orders_dropped': self.orders_dropped,
             'total_volume': self.total_volume,
-            'positions': self.positions.copy(),
+            'positions': self.positions,
             'fill_rate': self.orders_filled / max(1, self.orders_sent)
         }
+
+
+class HFTTrader(Trader):
+    """
+    Trading bot tuned for high-frequency mode: faster, smaller, tighter orders
+    """
+    
+    min_order_size = 1
+    max_order_size = 10  # Small enough to stay affordable
+    price_volatility = 0.01
+    order_frequency = 0.05
+
+
+class TraderPool:
+    """
+    Runs trading bots as tasks on a single asyncio event loop thread
+    """
+    
+    def __init__(self, traders):
+        """
+        Initialize the pool
+        
+        Args:
+            traders (list): Traders to run
+        """
+        self.traders = list(traders)
+        self.loop = None
+        self.thread = None
+        self._tasks = None
+    
+    def start(self):
+        """Activate every trader and start the event loop thread"""
+        if self.thread is not None or not self.traders:
+            return
+        
+        for trader in self.traders:
+            trader.start_trading()
+        
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop,
+                                       name="traders",
+                                       daemon=True)
+        self.thread.start()
+    
+    def _run_loop(self):
+        """Event loop thread body: run every trader until all are stopped"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._run_traders())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+    
+    async def _run_traders(self):
+        self._tasks = asyncio.gather(
+            *(self._run_trader(trader) for trader in self.traders))
+        await self._tasks
+    
+    @staticmethod
+    async def _run_trader(trader):
+        """Send a trader's orders as their deadlines come due"""
+        while trader.is_active:
+            delay = trader.next_order_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if trader.is_active:
+                trader.step()
+    
+    def stop(self):
+        """Stop every trader and wake the event loop so it can exit"""
+        for trader in self.traders:
+            trader.stop_trading()
+        if self.thread is not None:
+            # Sleeping traders are cancelled rather than left to time out
+            if self._tasks is not None and not self.loop.is_closed():
+                try:
+                    self.loop.call_soon_threadsafe(self._tasks.cancel)
+                except RuntimeError:
+                    pass  # Loop already closed
+            self.thread.join(timeout=2.0)
+            self.thread = None
+            self.loop = None
+            self._tasks = None
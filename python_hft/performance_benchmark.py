@@ -4,14 +4,14 @@ HFT Performance Benchmark Tool
 Measures and displays real-time trading simulation performance
 """
 
-import time
+import sys
 import threading
-from collections import deque
+import time
 from datetime import datetime
 import numpy as np
 
 from models.engine import TradingEngine
-from models.trader import Trader
+from models.trader import Trader, TraderPool
 
 
 class PerformanceBenchmark:
@@ -20,18 +20,20 @@ class PerformanceBenchmark:
     def __init__(self):
         self.engine = TradingEngine()
         self.traders = []
+        self.trader_pool = None
         self.running = False
+        # Set by stop_benchmark to wake the sampler before its next update
+        self.stop_event = threading.Event()
 
         # Performance metrics
         self.start_time = None
-        self.trade_timestamps = deque(maxlen=10000)
-        self.order_timestamps = deque(maxlen=10000)
-        self.latency_measurements = deque(maxlen=1000)
 
         # Real-time stats
         self.current_tps = 0
         self.current_ops = 0
         self.avg_latency = 0
+        self.p50_latency = 0
+        self.p99_latency = 0
         self.peak_tps = 0
         self.total_trades = 0
 
@@ -62,88 +64,113 @@ class PerformanceBenchmark:
         print(f"Traders: {len(self.traders)}")
         print(
             f"Symbols: {self.traders[0].symbols if self.traders else 'None'}")
+        # The engine and trader loop threads only run in parallel on a
+        # free-threaded (3.13t) build; 3.12 and older always hold the GIL
+        gil_check = getattr(sys, '_is_gil_enabled', None)
+        if gil_check is None or gil_check():
+            print("GIL: enabled (engine and traders share one core)")
+        else:
+            print("GIL: disabled (free-threaded build)")
         print("-" * 50)
 
         self.running = True
+        self.stop_event.clear()
         self.start_time = time.time()
 
         # Start engine
         self.engine.start()
 
-        # Start traders
-        for trader in self.traders:
-            trader.start_trading()
+        # Start traders on a shared event loop thread
+        self.trader_pool = TraderPool(self.traders)
+        self.trader_pool.start()
 
-        # Start monitoring thread
-        monitor_thread = threading.Thread(target=self._monitor_performance,
-                                          daemon=True)
-        monitor_thread.start()
-
-        # Run for specified duration
+        # Sample from this thread for the specified duration
         try:
-            time.sleep(duration_seconds)
+            self._monitor_performance(duration_seconds)
         except KeyboardInterrupt:
             print("\nBenchmark interrupted by user")
 
-        self.stop_benchmark()
+        # Unless stop_benchmark already ran from elsewhere
+        if self.running:
+            self.stop_benchmark()
 
     def stop_benchmark(self):
         """Stop the benchmark and print final results"""
         self.running = False
+        self.stop_event.set()
 
         # Stop traders
-        for trader in self.traders:
-            trader.stop_trading()
+        if self.trader_pool is not None:
+            self.trader_pool.stop()
 
         # Stop engine
         self.engine.stop()
 
         self._print_final_results()
 
-    def _monitor_performance(self):
+    def _monitor_performance(self, duration_seconds):
         """Monitor and display real-time performance metrics"""
-        last_update = time.time()
+        # Updates run on a fixed monotonic schedule, one per second, so
+        # sampling time does not push later updates back
+        start = time.monotonic()
+        end_time = start + duration_seconds
+        next_update = start + 1.0
+        last_update = start
         last_trade_count = 0
-        last_order_count = 0
-
-        while self.running:
-            current_time = time.time()
-
-            # Update every 1 second
-            if current_time - last_update >= 1.0:
-                stats = self.engine.get_performance_stats()
-
-                # Calculate rates
-                current_trades = stats['total_trades']
-                trade_delta = current_trades - last_trade_count
-                self.current_tps = trade_delta / (current_time - last_update)
-
-                # Update peak
-                if self.current_tps > self.peak_tps:
-                    self.peak_tps = self.current_tps
-
-                # Calculate latency
-                self.avg_latency = stats.get('avg_latency_ms', 0)
-
-                # Print real-time stats
-                elapsed = current_time - self.start_time
-                self._print_realtime_stats(elapsed, stats)
-
-                last_update = current_time
-                last_trade_count = current_trades
-
-            time.sleep(0.1)
 
-    def _print_realtime_stats(self, elapsed, stats):
+        while True:
+            # Sleep straight to the next update or the end, unless stopped
+            remaining = min(next_update, end_time) - time.monotonic()
+            if remaining > 0 and self.stop_event.wait(remaining):
+                break
+
+            current_time = time.monotonic()
+            if current_time >= end_time or self.stop_event.is_set():
+                break
+            if current_time < next_update:
+                continue
+
+            # Read the engine counters directly; plain int reads need no
+            # lock and skip building the full stats dict
+            current_trades = self.engine.total_trades
+            active_orders = len(self.engine.active_orders)
+            latencies = self.engine.get_recent_latencies()
+
+            # Calculate rates
+            trade_delta = current_trades - last_trade_count
+            self.current_tps = trade_delta / (current_time - last_update)
+
+            # Update peak
+            if self.current_tps > self.peak_tps:
+                self.peak_tps = self.current_tps
+
+            # Calculate latency
+            if len(latencies):
+                self.avg_latency = float(latencies.mean())
+                self.p50_latency, self.p99_latency = np.percentile(
+                    latencies, (50, 99))
+
+            # Print real-time stats
+            elapsed = current_time - start
+            self._print_realtime_stats(elapsed, current_trades, active_orders)
+
+            last_update = current_time
+            last_trade_count = current_trades
+            next_update += 1.0
+            if next_update <= current_time:
+                next_update = current_time + 1.0
+
+    def _print_realtime_stats(self, elapsed, total_trades, active_orders):
         """Print real-time performance statistics"""
         # Clear previous line and print new stats
         print(
             f"\r⚡ {elapsed:6.1f}s | "
             f"TPS: {self.current_tps:7.1f} | "
             f"Peak: {self.peak_tps:7.1f} | "
-            f"Trades: {stats['total_trades']:6d} | "
-            f"Orders: {stats['active_orders']:4d} | "
-            f"Latency: {self.avg_latency:5.2f}ms",
+            f"Trades: {total_trades:6d} | "
+            f"Orders: {active_orders:4d} | "
+            f"Latency: {self.avg_latency:5.2f}ms "
+            f"(p50 {self.p50_latency:5.2f} / p99 {self.p99_latency:5.2f})",
             end="",
             flush=True)
 
@@ -167,12 +194,18 @@ class PerformanceBenchmark:
         print(f"   Peak TPS:             {self.peak_tps:.1f}")
         print(
             f"   Average Latency:      {final_stats['avg_latency_ms']:.2f} ms")
+        latencies = self.engine.get_recent_latencies()
+        if len(latencies):
+            p50, p99, p999 = np.percentile(latencies, (50, 99, 99.9))
+            print(f"   Latency p50/p99/p999: "
+                  f"{p50:.2f} / {p99:.2f} / {p999:.2f} ms")
         print(f"   Active Symbols:       {final_stats['symbols_active']}")
 
         print(f"\n💰 TRADING STATISTICS:")
-        total_pnl = sum(trader.get_total_pnl() for trader in self.traders)
-        total_orders = sum(trader.orders_sent for trader in self.traders)
-        total_fills = sum(trader.orders_filled for trader in self.traders)
+        trader_stats = self.engine.get_trader_stats()
+        total_pnl = trader_stats['pnl'].sum()
+        total_orders = int(trader_stats['orders_sent'].sum())
+        total_fills = int(trader_stats['orders_filled'].sum())
         fill_rate = (total_fills / max(1, total_orders)) * 100
 
         print(f"   Total Orders Sent:    {total_orders:,}")
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from utils.csv_importer import CSVImporter
+
+
+class RecordingEngine:
+    """Engine stand-in that keeps submitted orders"""
+    
+    def __init__(self):
+        self.orders = []
+    
+    def submit_order(self, order):
+        self.orders.append(order)
+    
+    def submit_orders(self, orders):
+        self.orders.extend(orders)
+
+
+HEADER = "trader_id,symbol,side,quantity,price,timestamp\n"
+
+
+def import_rows(rows):
+    engine = RecordingEngine()
+    result = CSVImporter().import_orders_from_csv(HEADER + rows, engine)
+    return result, engine.orders
+
+
+def test_mixed_utc_offsets_import_every_row():
+    # Non-ISO values either side of a DST change carry different offsets
+    result, orders = import_rows(
+        "A,X,BUY,1,2,03/09/2025 01:00 -0500\n"
+        "B,X,SELL,1,2,03/09/2025 03:00 -0400\n")
+    
+    assert result['success'], result
+    assert result['orders_submitted'] == 2
+    assert [round(order.timestamp.timestamp()) for order in orders] == [
+        1741500000, 1741503600]
+
+
+def test_aware_and_naive_timestamps_import_every_row():
+    result, orders = import_rows(
+        "A,X,BUY,1,2,2025-03-09 01:00:00-05:00\n"
+        "B,X,SELL,1,2,2025-03-09 03:00:00\n")
+    
+    assert result['success'], result
+    assert round(orders[0].timestamp.timestamp()) == 1741500000
+    assert orders[1].timestamp == datetime(2025, 3, 9, 3, 0)
+
+
+def test_unparseable_timestamp_falls_back_to_now():
+    before = datetime.now()
+    result, orders = import_rows(
+        "A,X,BUY,1,2,03/09/2025 01:00 -0500\n"
+        "B,X,SELL,1,2,03/09/2025 03:00 -0400\n"
+        "C,X,BUY,1,2,not a time\n")
+    
+    assert result['success'], result
+    assert orders[2].timestamp >= before
+
+
+def test_header_only_upload_fails_validation():
+    importer = CSVImporter()
+    header_only = "trader_id,symbol,side,quantity,price\n"
+    
+    validation = importer.validate_csv_format(header_only)
+    assert not validation['success']
+    assert validation['error'] == ("Quantity column must contain numeric values; "
+                                   "Price column must contain numeric values")
+    
+    engine = RecordingEngine()
+    result = importer.import_orders_from_csv(header_only, engine)
+    assert not result['success']
+    assert engine.orders == []
+
+
+def test_empty_numeric_cells_are_reported_as_empty():
+    validation = CSVImporter().validate_csv_format(
+        "trader_id,symbol,side,quantity,price\nA,X,BUY,,\n")
+    
+    assert not validation['success']
+    assert validation['error'] == ("quantity column contains empty values; "
+                                   "price column contains empty values")
@@ -0,0 +1,207 @@
+from collections import deque
+import time
+
+import numpy as np
+
+from models.engine import TradingEngine
+from models.order import Order, OrderSide, OrderStatus
+from models.trader import Trader
+
+
+def process(engine, *orders):
+    """Run orders through the matching path the execution thread uses"""
+    with engine.orders_lock:
+        for order in orders:
+            engine._process_order(order)
+
+
+def buy(trader_id, quantity, price, symbol='X'):
+    return Order(trader_id, symbol, OrderSide.BUY, quantity, price)
+
+
+def sell(trader_id, quantity, price, symbol='X'):
+    return Order(trader_id, symbol, OrderSide.SELL, quantity, price)
+
+
+def test_better_price_fills_first_then_earlier_order():
+    engine = TradingEngine()
+    process(engine, sell('S1', 1, 10.00), sell('S2', 1, 10.00),
+            sell('S3', 1, 9.99))
+    
+    process(engine, buy('B', 3, 10.00))
+    
+    trades = engine.get_recent_trades(0)
+    assert [(row[3], row[6]) for row in trades] == [
+        (9.99, 'S3'), (10.00, 'S1'), (10.00, 'S2')]
+    assert engine.get_orderbook('X').get_best_ask() is None
+
+
+def test_partial_fill_leaves_the_rest_resting():
+    engine = TradingEngine()
+    resting = sell('S', 10, 10.00)
+    incoming = buy('B', 4, 10.50)
+    process(engine, resting, incoming)
+    
+    assert incoming.status == OrderStatus.FILLED
+    assert incoming.order_id not in engine.active_orders
+    assert resting.status == OrderStatus.PARTIALLY_FILLED
+    assert resting.quantity == 6
+    # Filled at the resting order's price
+    assert incoming.get_average_fill_price() == 10.00
+    
+    asks = engine.get_orderbook('X').asks
+    assert asks.get_volume_at_price(10.00) == 6
+    assert asks.get_total_volume() == 6
+    assert engine.total_volume == 4
+
+
+def test_cancelled_order_leaves_the_book():
+    engine = TradingEngine()
+    resting = buy('B', 5, 10.00)
+    process(engine, resting)
+    
+    assert engine.cancel_order(resting.order_id)
+    assert resting.status == OrderStatus.CANCELLED
+    assert engine.get_orderbook('X').get_best_bid() is None
+    assert not engine.cancel_order(resting.order_id)
+    
+    process(engine, sell('S', 5, 9.00))
+    assert engine.total_trades == 0
+
+
+def test_sub_cent_prices_keep_their_own_levels():
+    engine = TradingEngine()
+    process(engine, sell('S1', 1, 10.0002), sell('S2', 1, 10.0001))
+    
+    book = engine.get_orderbook('X')
+    assert [level.price for level in book.asks.get_top_levels(5)] == [
+        10.0001, 10.0002]
+    
+    process(engine, buy('B', 2, 10.0001))
+    assert engine.total_trades == 1
+    assert book.get_best_ask_price() == 10.0002
+
+
+def test_latency_ring_wraps_at_window():
+    engine = TradingEngine()
+    window = engine.LATENCY_WINDOW
+    now = time.time()
+    for i in range(window + 10):
+        order = buy('B', 1, 1.00)
+        # Submitted i seconds ago, so its latency is i seconds and a bit
+        order.submit_time = now - i
+        process(engine, order)
+    
+    latencies = engine.get_recent_latencies()
+    assert engine.latency_count == window + 10
+    assert len(latencies) == window
+    # The newest ten overwrote the oldest ten slots
+    assert np.rint(latencies / 1000).astype(int).tolist() == (
+        list(range(window, window + 10)) + list(range(10, window)))
+
+
+def test_trade_columns_survive_the_ring_wrapping():
+    engine = TradingEngine()
+    capacity = len(engine._trade_prices)
+    for i in range(capacity + 5):
+        symbol = 'A' if i % 2 else 'B'
+        process(engine, sell('S', i + 1, 10.00, symbol),
+                buy('B', i + 1, 10.00, symbol))
+    
+    with engine.orders_lock:
+        prices, quantities = engine._symbol_trade_columns('A', 3)
+    assert engine.total_trades == capacity + 5
+    # Newest 'A' trades, oldest first, across the wrap point
+    assert quantities.tolist() == [capacity, capacity + 2, capacity + 4]
+    assert prices.tolist() == [10.00, 10.00, 10.00]
+
+
+class RecordingEngine(TradingEngine):
+    """Engine that records the order each batch is drained in"""
+    
+    def __init__(self, batches):
+        super().__init__()
+        self.processed = []
+        self.batches = batches
+    
+    def _process_order(self, order):
+        self.processed.append(order.trader_id)
+        if len(self.processed) == self.batches * self.batch_size:
+            self.is_running = False
+
+
+class RingTrader:
+    """Just enough of a trader for the engine to drain its order ring"""
+    
+    def __init__(self, trader_id):
+        self.trader_id = trader_id
+        self.order_ring = deque()
+
+
+def test_batches_rotate_across_queue_and_traders():
+    engine = RecordingEngine(batches=3)
+    engine.batch_size = 2
+    traders = [RingTrader('T1'), RingTrader('T2')]
+    for trader in traders:
+        engine.register_trader(trader)
+        trader.order_ring.extend(buy(trader.trader_id, 1, 1.00)
+                                 for _ in range(10))
+    engine.submit_orders([buy('Q', 1, 1.00) for _ in range(10)])
+    
+    engine.is_running = True
+    engine._execution_loop()
+    
+    # Each batch carries on from the first source the last one did not reach
+    assert engine.processed == ['Q', 'T1', 'T2', 'Q', 'T1', 'T2']
+
+
+def test_spare_batch_room_goes_to_sources_with_more_orders():
+    engine = RecordingEngine(batches=1)
+    engine.batch_size = 4
+    trader = RingTrader('T1')
+    engine.register_trader(trader)
+    trader.order_ring.append(buy('T1', 1, 1.00))
+    engine.submit_orders([buy('Q', 1, 1.00) for _ in range(10)])
+    
+    engine.is_running = True
+    engine._execution_loop()
+    
+    assert engine.processed == ['Q', 'Q', 'T1', 'Q']
+
+
+def test_busy_queue_does_not_starve_a_trader():
+    engine = RecordingEngine(batches=1)
+    trader = RingTrader('T1')
+    engine.register_trader(trader)
+    trader.order_ring.extend(buy('T1', 1, 1.00) for _ in range(5))
+    engine.submit_orders([buy('Q', 1, 1.00) for _ in range(1000)])
+    
+    engine.is_running = True
+    engine._execution_loop()
+    
+    assert engine.processed.count('T1') == 5
+    assert not trader.order_ring
+
+
+def test_trader_stats_totals():
+    engine = TradingEngine()
+    buyer = Trader('T1', 1000.0, ['X'], engine)
+    seller = Trader('T2', 1000.0, ['X'], engine)
+    engine.register_trader(buyer)
+    engine.register_trader(seller)
+    
+    process(engine, sell('T2', 10, 5.00), buy('T1', 4, 5.00),
+            buy('T1', 6, 5.00))
+    
+    stats = engine.get_trader_stats()
+    assert stats['trader_id'].tolist() == ['T1', 'T2']
+    assert stats['cash'].tolist() == [950.0, 1050.0]
+    # The buyer holds 10 shares valued at the 5.00 trade price; the
+    # seller's short position is not valued
+    assert stats['portfolio_value'].tolist() == [1000.0, 1050.0]
+    assert stats['pnl'].tolist() == [0.0, 50.0]
+    assert stats['orders_filled'].tolist() == [2, 2]
+    assert np.isclose(stats['cash'].sum(), 2000.0)
+    
+    only = engine.get_trader_stats(['T2', 'missing'])
+    assert only['trader_id'].tolist() == ['T2']
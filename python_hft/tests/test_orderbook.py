@@ -0,0 +1,73 @@
+from models.order import Order, OrderSide
+from models.orderbook import OrderBookSide
+
+
+def test_optimistic_read_skips_the_lock_when_nothing_moved():
+    side = OrderBookSide(is_bid_side=True)
+    owned = []
+    
+    def compute():
+        owned.append(side.lock._is_owned())
+        return 'read'
+    
+    assert side._optimistic_read(compute) == 'read'
+    assert owned == [False]
+
+
+def test_optimistic_read_retries_under_the_lock_after_a_write():
+    side = OrderBookSide(is_bid_side=True)
+    owned = []
+    
+    def compute():
+        owned.append(side.lock._is_owned())
+        if len(owned) == 1:
+            # A writer finished a mutation during the unlocked read
+            side._version += 2
+        return len(owned)
+    
+    assert side._optimistic_read(compute) == 2
+    assert owned == [False, True]
+
+
+def test_optimistic_read_retries_under_the_lock_when_the_read_fails():
+    side = OrderBookSide(is_bid_side=True)
+    owned = []
+    
+    def compute():
+        owned.append(side.lock._is_owned())
+        if len(owned) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        return 'read'
+    
+    assert side._optimistic_read(compute) == 'read'
+    assert owned == [False, True]
+
+
+def test_optimistic_read_locks_straight_away_during_a_write():
+    side = OrderBookSide(is_bid_side=True)
+    side._version += 1  # A write is in progress
+    owned = []
+    
+    def compute():
+        owned.append(side.lock._is_owned())
+        return 'read'
+    
+    assert side._optimistic_read(compute) == 'read'
+    assert owned == [True]
+
+
+def test_best_price_follows_adds_and_removals():
+    side = OrderBookSide(is_bid_side=True)
+    low = Order('A', 'X', OrderSide.BUY, 1, 9.99)
+    high = Order('B', 'X', OrderSide.BUY, 1, 10.01)
+    side.add_order(low)
+    side.add_order(high)
+    
+    assert side.get_best_price() == 10.01
+    assert side.get_best_order() is high
+    
+    side.remove_order(high.order_id)
+    assert side.best == (low.price_ticks, 9.99)
+    
+    side.remove_order(low.order_id)
+    assert side.best == (None, None)
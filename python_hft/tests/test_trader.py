@@ -0,0 +1,113 @@
+import pytest
+
+from models.engine import TradingEngine
+from models.order import Order, OrderSide
+from models.trader import Trader
+
+
+def process(engine, *orders):
+    """Run orders through the matching path the execution thread uses"""
+    with engine.orders_lock:
+        for order in orders:
+            engine._process_order(order)
+
+
+def make_trader(engine, trader_id='T1'):
+    trader = Trader(trader_id, 1000.0, ['X', 'Y'], engine)
+    engine.register_trader(trader)
+    return trader
+
+
+def count_pricing(trader, monkeypatch):
+    """Count the market price estimates a portfolio valuation makes"""
+    calls = []
+    estimate = trader._estimate_market_price
+    
+    def counting(symbol, refresh=False):
+        calls.append(symbol)
+        return estimate(symbol, refresh)
+    
+    monkeypatch.setattr(trader, '_estimate_market_price', counting)
+    return calls
+
+
+def test_portfolio_value_is_reused_until_a_held_symbol_trades(monkeypatch):
+    engine = TradingEngine()
+    trader = make_trader(engine)
+    process(engine, Order('S', 'X', OrderSide.SELL, 10, 5.00),
+            Order('T1', 'X', OrderSide.BUY, 10, 5.00))
+    calls = count_pricing(trader, monkeypatch)
+    
+    assert trader.get_portfolio_value() == 1000.0
+    assert trader.get_portfolio_value() == 1000.0
+    assert calls == ['X']
+    
+    # A symbol the trader does not hold leaves the value alone
+    process(engine, Order('S', 'Y', OrderSide.SELL, 1, 7.00),
+            Order('B', 'Y', OrderSide.BUY, 1, 7.00))
+    assert trader.get_portfolio_value() == 1000.0
+    assert calls == ['X']
+    
+    # A trade in the held symbol reprices it
+    process(engine, Order('S', 'X', OrderSide.SELL, 10, 7.00),
+            Order('B', 'X', OrderSide.BUY, 10, 7.00))
+    assert trader.get_portfolio_value() == pytest.approx(950.0 + 10 * 6.00)
+    assert calls == ['X', 'X']
+
+
+def test_portfolio_value_follows_the_trader_own_fills(monkeypatch):
+    engine = TradingEngine()
+    trader = make_trader(engine)
+    calls = count_pricing(trader, monkeypatch)
+    
+    assert trader.get_portfolio_value() == 1000.0
+    process(engine, Order('S', 'X', OrderSide.SELL, 10, 5.00),
+            Order('T1', 'X', OrderSide.BUY, 10, 5.00))
+    
+    assert trader.orders_filled == 1
+    assert trader.get_portfolio_value() == 1000.0
+    assert calls == ['X']
+
+
+def test_portfolio_value_priced_from_the_book_follows_book_changes():
+    engine = TradingEngine()
+    trader = make_trader(engine)
+    # Hold shares in a symbol that has not traded yet
+    trader.on_order_filled(Order('T1', 'X', OrderSide.BUY, 10, 5.00), 10, 5.00)
+    process(engine, Order('B', 'X', OrderSide.BUY, 1, 6.00),
+            Order('S', 'X', OrderSide.SELL, 1, 8.00))
+    
+    assert trader.get_portfolio_value() == 950.0 + 10 * 7.00
+    
+    # A new quote changes the mid price without any trade
+    process(engine, Order('S', 'X', OrderSide.SELL, 1, 7.00))
+    assert trader.get_portfolio_value() == 950.0 + 10 * 6.50
+
+
+def test_portfolio_value_of_a_snapshot():
+    engine = TradingEngine()
+    trader = make_trader(engine)
+    process(engine, Order('S', 'X', OrderSide.SELL, 10, 5.00),
+            Order('T1', 'X', OrderSide.BUY, 10, 5.00))
+    account = trader.snapshot_account()
+    
+    # A later fill does not touch the snapshot
+    process(engine, Order('S', 'X', OrderSide.SELL, 5, 5.00),
+            Order('T1', 'X', OrderSide.BUY, 5, 5.00))
+    
+    assert account[0] == 950.0
+    assert account[1].tolist() == [10, 0]
+    assert trader.get_portfolio_value(account) == 1000.0
+    assert trader.get_portfolio_value() == 1000.0
+
+
+def test_unregistered_trader_cannot_start():
+    engine = TradingEngine()
+    trader = Trader('T1', 1000.0, ['X'], engine)
+    
+    with pytest.raises(RuntimeError):
+        trader.start_trading()
+    
+    engine.register_trader(trader)
+    trader.start_trading()
+    assert trader.is_active
@@ -1,16 +1,50 @@
 import pandas as pd
-import io
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+
 from models.order import Order, OrderSide
 
+# Side values accepted by validate_csv_format
+_SIDE_MAP = {
+    'BUY': OrderSide.BUY,
+    'SELL': OrderSide.SELL,
+    'buy': OrderSide.BUY,
+    'sell': OrderSide.SELL
+}
+
+
+def _is_numeric_column(column):
+    """
+    Check whether an Arrow column holds numbers
+    
+    Arrow gives columns of only empty cells, and those of a header-only file,
+    the null type. Empty cells count as numeric, as pandas reads them as NaN,
+    and are reported as empty values; a column with no rows does not.
+    """
+    arrow_type = column.type
+    if pa.types.is_null(arrow_type):
+        return len(column) > 0
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+def _has_non_positive(column):
+    """Check whether a numeric Arrow column holds a value <= 0, skipping nulls"""
+    # Reducing to the minimum avoids building a full-length boolean mask
+    minimum = pc.min(column).as_py()
+    return minimum is not None and minimum <= 0
+
 class CSVImporter:
     """
     Utility class for importing trading data from CSV files
     """
     
+    # Number of imported orders handed to the engine per submission
+    IMPORT_BATCH_SIZE = 1024
+    
     def __init__(self):
         """Initialize the CSV importer"""
         self.logger = logging.getLogger(__name__)
@@ -25,69 +59,110 @@ class CSVImporter:
         Returns:
             dict: Validation results with success status and error messages
         """
-        try:
-            # Read CSV content
-            df = pd.read_csv(io.StringIO(csv_content))
-            
-            # Required columns
-            required_columns = ['trader_id', 'symbol', 'side', 'quantity', 'price']
-            
-            # Check for required columns
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                return {
-                    'success': False,
-                    'error': f"Missing required columns: {', '.join(missing_columns)}",
-                    'required_columns': required_columns,
-                    'found_columns': list(df.columns)
-                }
-            
-            # Validate data types and values
-            errors = []
-            
-            # Check quantity is numeric and positive
-            if not pd.api.types.is_numeric_dtype(df['quantity']):
-                errors.append("Quantity column must contain numeric values")
-            elif (df['quantity'] <= 0).any():
-                errors.append("Quantity values must be positive")
-            
-            # Check price is numeric and positive
-            if not pd.api.types.is_numeric_dtype(df['price']):
-                errors.append("Price column must contain numeric values")
-            elif (df['price'] <= 0).any():
-                errors.append("Price values must be positive")
-            
-            # Check side values are valid
-            valid_sides = ['BUY', 'SELL', 'buy', 'sell']
-            invalid_sides = df[~df['side'].isin(valid_sides)]['side'].unique()
-            if len(invalid_sides) > 0:
-                errors.append(f"Invalid side values: {', '.join(invalid_sides)}. Must be BUY or SELL")
+        return self._read_and_validate(csv_content)[1]
+    
+    def _read_and_validate(self, csv_content: str) -> Tuple[Optional[pa.Table], Dict[str, any]]:
+        """
+        Parse CSV content once and validate the parsed table
+        
+        Args:
+            csv_content (str): CSV content as string
             
-            # Check for empty values in required fields
-            for col in required_columns:
-                if df[col].isna().any():
-                    errors.append(f"{col} column contains empty values")
+        Returns:
+            tuple: (table, validation results); table is None if parsing failed
+        """
+        try:
+            table = self._read_table(csv_content)
+            return table, self._validate_table(table)
+        except Exception as e:
+            return None, {
+                'success': False,
+                'error': f"Error reading CSV: {str(e)}"
+            }
+    
+    def _read_table(self, csv_content: str) -> pa.Table:
+        """
+        Parse CSV content with Arrow's multithreaded reader
+        
+        Args:
+            csv_content (str): CSV content as string
             
-            if errors:
-                return {
-                    'success': False,
-                    'error': '; '.join(errors),
-                    'row_count': len(df)
-                }
+        Returns:
+            pa.Table: Parsed content; empty cells are nulls, as pandas NaNs were
+        """
+        return pa_csv.read_csv(
+            pa.BufferReader(csv_content.encode('utf-8')),
+            read_options=pa_csv.ReadOptions(block_size=1 << 20),
+            convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    
+    def _validate_table(self, table: pa.Table) -> Dict[str, any]:
+        """
+        Validate an already parsed CSV table
+        
+        Args:
+            table (pa.Table): Parsed CSV content
             
+        Returns:
+            dict: Validation results with success status and error messages
+        """
+        # Required columns
+        required_columns = ['trader_id', 'symbol', 'side', 'quantity', 'price']
+        
+        # Check for required columns
+        missing_columns = [col for col in required_columns if col not in table.column_names]
+        if missing_columns:
             return {
-                'success': True,
-                'row_count': len(df),
-                'symbols': sorted(df['symbol'].unique().tolist()),
-                'traders': sorted(df['trader_id'].unique().tolist()),
-                'preview': df.head().to_dict('records')
+                'success': False,
+                'error': f"Missing required columns: {', '.join(missing_columns)}",
+                'required_columns': required_columns,
+                'found_columns': table.column_names
             }
-            
-        except Exception as e:
+        
+        # Validate data types and values
+        errors = []
+        
+        # Check quantity is numeric and positive
+        quantity = table.column('quantity')
+        if not _is_numeric_column(quantity):
+            errors.append("Quantity column must contain numeric values")
+        elif _has_non_positive(quantity):
+            errors.append("Quantity values must be positive")
+        
+        # Check price is numeric and positive
+        price = table.column('price')
+        if not _is_numeric_column(price):
+            errors.append("Price column must contain numeric values")
+        elif _has_non_positive(price):
+            errors.append("Price values must be positive")
+        
+        # Check side values are valid
+        valid_sides = pa.array(list(_SIDE_MAP))
+        # Only the distinct values are checked against the valid set
+        sides = pc.unique(pc.cast(table.column('side'), pa.string()))
+        invalid_sides = sides.filter(
+            pc.invert(pc.is_in(sides, value_set=valid_sides))).to_pylist()
+        if len(invalid_sides) > 0:
+            errors.append(f"Invalid side values: {', '.join(invalid_sides)}. Must be BUY or SELL")
+        
+        # Check for empty values in required fields
+        for col in required_columns:
+            if table.column(col).null_count > 0:
+                errors.append(f"{col} column contains empty values")
+        
+        if errors:
             return {
                 'success': False,
-                'error': f"Error reading CSV: {str(e)}"
+                'error': '; '.join(errors),
+                'row_count': table.num_rows
             }
+        
+        return {
+            'success': True,
+            'row_count': table.num_rows,
+            'symbols': sorted(pc.unique(table.column('symbol')).to_pylist()),
+            'traders': sorted(pc.unique(table.column('trader_id')).to_pylist()),
+            'preview': table.slice(0, 5).to_pylist()
+        }
     
     def import_orders_from_csv(self, csv_content: str, engine) -> Dict[str, any]:
         """
@@ -101,35 +176,44 @@ class CSVImporter:
             dict: Import results with success status and statistics
         """
         try:
-            # Validate CSV first
-            validation = self.validate_csv_format(csv_content)
+            # Validate CSV first, keeping the parsed table for the import
+            table, validation = self._read_and_validate(csv_content)
             if not validation['success']:
                 return validation
             
-            # Read CSV content
-            df = pd.read_csv(io.StringIO(csv_content))
+            df = table.to_pandas()
             
             # Convert and submit orders
             orders_submitted = 0
             orders_failed = 0
             errors = []
             
-            for index, row in df.iterrows():
+            # Convert each column once instead of building a Series per row
+            trader_ids = df['trader_id'].astype(str).tolist()
+            symbols = df['symbol'].astype(str).str.upper().tolist()
+            side_strs = df['side'].astype(str).tolist()
+            sides = list(map(_SIDE_MAP.get, side_strs))
+            quantities = df['quantity'].astype('int64').tolist()
+            prices = df['price'].astype('float64').tolist()
+            
+            # Parse all timestamps in one pass; a value that is present but
+            # unparseable falls back to the current time
+            if 'timestamp' in df.columns:
+                has_timestamp = df['timestamp'].notna().tolist()
+                timestamps = self._parse_timestamps(df['timestamp'])
+            else:
+                has_timestamp = [False] * len(df)
+                timestamps = has_timestamp
+            
+            batch = []
+            
+            for index, (trader_id, symbol, side, quantity, price,
+                        provided, timestamp) in enumerate(zip(
+                            trader_ids, symbols, sides, quantities, prices,
+                            has_timestamp, timestamps)):
                 try:
-                    # Parse order data
-                    trader_id = str(row['trader_id'])
-                    symbol = str(row['symbol']).upper()
-                    side_str = str(row['side']).upper()
-                    quantity = int(row['quantity'])
-                    price = float(row['price'])
-                    
-                    # Convert side to enum
-                    if side_str == 'BUY':
-                        side = OrderSide.BUY
-                    elif side_str == 'SELL':
-                        side = OrderSide.SELL
-                    else:
-                        errors.append(f"Row {index + 1}: Invalid side '{side_str}'")
+                    if side is None:
+                        errors.append(f"Row {index + 1}: Invalid side '{side_strs[index]}'")
                         orders_failed += 1
                         continue
                     
@@ -137,20 +221,25 @@ class CSVImporter:
                     order = Order(trader_id, symbol, side, quantity, price)
                     
                     # Add timestamp if provided
-                    if 'timestamp' in row and pd.notna(row['timestamp']):
-                        try:
-                            order.timestamp = pd.to_datetime(row['timestamp'])
-                        except:
-                            # Use current time if timestamp parsing fails
-                            order.timestamp = datetime.now()
+                    if provided:
+                        order.timestamp = (timestamp if pd.notna(timestamp)
+                                           else datetime.now())
                     
-                    # Submit to engine
-                    engine.submit_order(order)
-                    orders_submitted += 1
+                    batch.append(order)
                     
                 except Exception as e:
                     errors.append(f"Row {index + 1}: {str(e)}")
                     orders_failed += 1
+                
+                # Submit to engine a batch at a time
+                if len(batch) == self.IMPORT_BATCH_SIZE:
+                    engine.submit_orders(batch)
+                    orders_submitted += len(batch)
+                    batch = []
+            
+            if batch:
+                engine.submit_orders(batch)
+                orders_submitted += len(batch)
             
             return {
                 'success': True,
@@ -168,6 +257,29 @@ class CSVImporter:
                 'error': f"Error importing orders: {str(e)}"
             }
     
+    def _parse_timestamps(self, column: pd.Series) -> List:
+        """
+        Parse a timestamp column, NaT for values that cannot be parsed
+        
+        Args:
+            column (pd.Series): Raw timestamp values
+            
+        Returns:
+            list: One Timestamp or NaT per value
+        """
+        try:
+            return pd.to_datetime(column, errors='coerce', format='mixed').tolist()
+        except ValueError:
+            # Different UTC offsets, or aware values mixed with naive ones,
+            # cannot share one column; parse the values one at a time
+            timestamps = []
+            for value in column:
+                try:
+                    timestamps.append(pd.to_datetime(value))
+                except Exception:
+                    timestamps.append(pd.NaT)
+            return timestamps
+    
     def get_sample_csv_format(self) -> str:
         """
         Get a sample CSV format for reference
@@ -217,9 +329,10 @@ class CSVImporter:
             list: List of unique symbols
         """
         try:
-            df = pd.read_csv(io.StringIO(csv_content))
-            if 'symbol' in df.columns:
-                return sorted(df['symbol'].str.upper().unique().tolist())
+            table = self._read_table(csv_content)
+            if 'symbol' in table.column_names:
+                symbols = pc.unique(pc.utf8_upper(table.column('symbol')))
+                return sorted(symbols.to_pylist())
             return []
         except:
             return []
@@ -236,23 +349,30 @@ class CSVImporter:
             dict: Dictionary of trader configurations
         """
         try:
-            df = pd.read_csv(io.StringIO(csv_content))
+            table = self._read_table(csv_content)
             
-            if 'trader_id' not in df.columns:
+            if 'trader_id' not in table.column_names:
                 return {}
             
-            # Get unique traders and their symbols
+            # Get unique traders and their symbols in one grouping pass,
+            # in order of first appearance
+            orders = pa.table({
+                'trader_id': table.column('trader_id'),
+                'symbol': pc.utf8_upper(table.column('symbol'))
+            })
+            grouped = orders.group_by('trader_id', use_threads=False).aggregate(
+                [('symbol', 'distinct'), ([], 'count_all')])
             trader_configs = {}
             
-            for trader_id in df['trader_id'].unique():
-                trader_data = df[df['trader_id'] == trader_id]
-                symbols = sorted(trader_data['symbol'].str.upper().unique().tolist())
-                
+            for trader_id, symbols, order_count in zip(
+                    grouped.column('trader_id').to_pylist(),
+                    grouped.column('symbol_distinct').to_pylist(),
+                    grouped.column('count_all').to_pylist()):
                 trader_configs[str(trader_id)] = {
                     'trader_id': str(trader_id),
                     'initial_cash': initial_cash,
-                    'symbols': symbols,
-                    'order_count': len(trader_data)
+                    'symbols': sorted(symbols),
+                    'order_count': order_count
                 }
             
             return trader_configs
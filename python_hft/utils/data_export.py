@@ -1,6 +1,8 @@
 import csv
 import io
 from datetime import datetime
+from itertools import accumulate, islice
+import numpy as np
 import pandas as pd
 
 class DataExporter:
@@ -8,6 +10,13 @@ class DataExporter:
     Utility class for exporting trading data to various formats
     """
     
+    # Number of rows formatted at a time by the streaming exporters
+    EXPORT_CHUNK_SIZE = 10_000
+    
+    # One trade as a CSV line, matching csv.writer's output for rows whose
+    # text fields need no quoting and hold no None
+    TRADE_LINE_FORMAT = '%s,%s,%s,%s,%s,%.4f,%.2f,%s,%s,%s,%s\r\n'
+    
     def __init__(self):
         """Initialize the data exporter"""
         pass
@@ -16,6 +25,9 @@ class DataExporter:
         """
         Export trade data to CSV format
         
+        Rows are formatted lazily and written in chunks, so only one chunk of
+        formatted lines exists at a time next to the output.
+        
         Args:
             trades (list): List of trade dictionaries
             
@@ -38,27 +50,64 @@ class DataExporter:
         writer = csv.writer(output)
         writer.writerow(headers)
         
-        # Write trade data
+        # Write trade data in bounded chunks
+        lines = self._iter_trade_lines(trades)
+        while True:
+            chunk = list(islice(lines, self.EXPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            output.write(''.join(chunk))
+        
+        csv_content = output.getvalue()
+        output.close()
+        
+        return csv_content
+    
+    def _iter_trade_lines(self, trades):
+        """Yield one CSV line per trade dictionary"""
+        line_format = self.TRADE_LINE_FORMAT
+        # Lines whose fields would need quoting are redone through csv
+        quoted = io.StringIO()
+        quoting_writer = csv.writer(quoted)
+        
         for trade in trades:
-            row = [
+            timestamp = trade.get('timestamp', '')
+            if not isinstance(timestamp, datetime):
+                timestamp = str(timestamp)
+            elif timestamp.tzinfo is None:
+                # Same text as strftime('%Y-%m-%d %H:%M:%S.%f'), much faster
+                timestamp = timestamp.isoformat(' ', 'microseconds')
+            else:
+                timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+            quantity = trade.get('quantity', 0)
+            price = trade.get('price', 0)
+            row = (
                 trade.get('trade_id', ''),
-                trade.get('timestamp', '').strftime('%Y-%m-%d %H:%M:%S.%f') if isinstance(trade.get('timestamp'), datetime) else str(trade.get('timestamp', '')),
+                timestamp,
                 trade.get('symbol', ''),
                 trade.get('side', ''),
-                trade.get('quantity', 0),
-                f"{trade.get('price', 0):.4f}",
-                f"{trade.get('quantity', 0) * trade.get('price', 0):.2f}",
+                quantity,
+                price,
+                quantity * price,
                 trade.get('buyer_id', ''),
                 trade.get('seller_id', ''),
                 trade.get('buy_order_id', ''),
                 trade.get('sell_order_id', '')
-            ]
-            writer.writerow(row)
-        
-        csv_content = output.getvalue()
-        output.close()
-        
-        return csv_content
+            )
+            line = line_format % row
+            
+            # Ten separators, no quotes and no line breaks before the end
+            # means no field needed quoting. csv writes None as an empty
+            # field where % would write 'None'
+            if line.count(',') != 10 or '"' in line or '\n' in line[:-2] \
+                    or '\r' in line[:-2] or None in row:
+                quoted.seek(0)
+                quoted.truncate()
+                quoting_writer.writerow(
+                    row[:5] + (f"{price:.4f}", f"{quantity * price:.2f}") +
+                    row[7:])
+                line = quoted.getvalue()
+            yield line
     
     def export_orderbook_to_csv(self, orderbook_data):
         """
@@ -85,7 +134,16 @@ class DataExporter:
         writer = csv.writer(output)
         writer.writerow(headers)
         
-        # Write orderbook data
+        # Write orderbook data; the writer drains the rows in one call
+        writer.writerows(self._iter_orderbook_rows(orderbook_data))
+        
+        csv_content = output.getvalue()
+        output.close()
+        
+        return csv_content
+    
+    def _iter_orderbook_rows(self, orderbook_data):
+        """Yield one CSV row per price level, bids then asks for each symbol"""
         for symbol, snapshot in orderbook_data.items():
             if not snapshot:
                 continue
@@ -93,44 +151,22 @@ class DataExporter:
             timestamp = snapshot.get('timestamp', datetime.now())
             timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M:%S.%f') if isinstance(timestamp, datetime) else str(timestamp)
             
-            # Write bid levels
-            bids = snapshot.get('bids', [])
-            cumulative_bid_volume = 0
-            for i, bid_level in enumerate(bids):
-                cumulative_bid_volume += bid_level.get('quantity', 0)
-                row = [
-                    symbol,
-                    timestamp_str,
-                    'BID',
-                    i + 1,  # Price level (1 = best)
-                    f"{bid_level.get('price', 0):.4f}",
-                    bid_level.get('quantity', 0),
-                    bid_level.get('order_count', 0),
-                    cumulative_bid_volume
-                ]
-                writer.writerow(row)
-            
-            # Write ask levels
-            asks = snapshot.get('asks', [])
-            cumulative_ask_volume = 0
-            for i, ask_level in enumerate(asks):
-                cumulative_ask_volume += ask_level.get('quantity', 0)
-                row = [
-                    symbol,
-                    timestamp_str,
-                    'ASK',
-                    i + 1,  # Price level (1 = best)
-                    f"{ask_level.get('price', 0):.4f}",
-                    ask_level.get('quantity', 0),
-                    ask_level.get('order_count', 0),
-                    cumulative_ask_volume
-                ]
-                writer.writerow(row)
-        
-        csv_content = output.getvalue()
-        output.close()
-        
-        return csv_content
+            for side, key in (('BID', 'bids'), ('ASK', 'asks')):
+                levels = snapshot.get(key, [])
+                # Levels come best-first, so a running sum is the depth
+                cumulative = accumulate(level.quantity for level in levels)
+                for i, (level, cumulative_volume) in enumerate(
+                        zip(levels, cumulative)):
+                    yield (
+                        symbol,
+                        timestamp_str,
+                        side,
+                        i + 1,  # Price level (1 = best)
+                        f"{level.price:.4f}",
+                        level.quantity,
+                        level.order_count,
+                        cumulative_volume
+                    )
     
     def export_trader_performance_to_csv(self, traders):
         """
@@ -159,33 +195,57 @@ class DataExporter:
         writer.writerow(headers)
         
         # Write trader performance data
-        for trader in traders:
-            portfolio_value = trader.get_portfolio_value()
-            total_pnl = trader.get_total_pnl()
-            pnl_percentage = (total_pnl / trader.initial_cash * 100) if trader.initial_cash > 0 else 0
-            fill_rate = (trader.orders_filled / max(1, trader.orders_sent) * 100)
-            avg_order_size = trader.total_volume / max(1, trader.orders_filled)
-            
-            row = [
-                trader.trader_id,
-                f"{trader.initial_cash:.2f}",
-                f"{trader.cash:.2f}",
-                f"{portfolio_value:.2f}",
-                f"{total_pnl:.2f}",
-                f"{pnl_percentage:.2f}",
-                trader.orders_sent,
-                trader.orders_filled,
-                f"{fill_rate:.2f}",
-                trader.total_volume,
-                f"{avg_order_size:.2f}"
-            ]
-            writer.writerow(row)
+        writer.writerows(self._iter_trader_rows(traders))
         
         csv_content = output.getvalue()
         output.close()
         
         return csv_content
     
+    def _iter_trader_rows(self, traders):
+        """Yield one CSV row per trader"""
+        # Read each trader once, then derive the ratios as array operations
+        count = len(traders)
+        initial_cash = np.fromiter((trader.initial_cash for trader in traders),
+                                   dtype=np.float64, count=count)
+        cash = np.fromiter((trader.cash for trader in traders),
+                           dtype=np.float64, count=count)
+        portfolio_value = np.fromiter(
+            (trader.get_portfolio_value() for trader in traders),
+            dtype=np.float64, count=count)
+        orders_sent = np.fromiter((trader.orders_sent for trader in traders),
+                                  dtype=np.int64, count=count)
+        orders_filled = np.fromiter((trader.orders_filled for trader in traders),
+                                    dtype=np.int64, count=count)
+        total_volume = np.fromiter((trader.total_volume for trader in traders),
+                                   dtype=np.int64, count=count)
+        
+        total_pnl = portfolio_value - initial_cash
+        pnl_percentage = np.divide(total_pnl, initial_cash, out=np.zeros(count),
+                                   where=initial_cash > 0) * 100
+        fill_rate = orders_filled / np.maximum(orders_sent, 1) * 100
+        avg_order_size = total_volume / np.maximum(orders_filled, 1)
+        
+        for row in zip([trader.trader_id for trader in traders],
+                       initial_cash.tolist(), cash.tolist(),
+                       portfolio_value.tolist(), total_pnl.tolist(),
+                       pnl_percentage.tolist(), orders_sent.tolist(),
+                       orders_filled.tolist(), fill_rate.tolist(),
+                       total_volume.tolist(), avg_order_size.tolist()):
+            yield (
+                row[0],
+                f"{row[1]:.2f}",
+                f"{row[2]:.2f}",
+                f"{row[3]:.2f}",
+                f"{row[4]:.2f}",
+                f"{row[5]:.2f}",
+                row[6],
+                row[7],
+                f"{row[8]:.2f}",
+                row[9],
+                f"{row[10]:.2f}"
+            )
+    
     def export_market_summary_to_csv(self, market_summary):
         """
         Export market summary data to CSV format
@@ -212,6 +272,15 @@ class DataExporter:
         writer.writerow(headers)
         
         # Write market summary data
+        writer.writerows(self._iter_market_summary_rows(market_summary))
+        
+        csv_content = output.getvalue()
+        output.close()
+        
+        return csv_content
+    
+    def _iter_market_summary_rows(self, market_summary):
+        """Yield one CSV row per symbol"""
         for symbol, stats in market_summary.items():
             best_bid = stats.get('best_bid', 0)
             best_ask = stats.get('best_ask', 0)
@@ -221,7 +290,7 @@ class DataExporter:
             # Calculate spread percentage
             spread_percentage = (spread / mid_price * 100) if mid_price > 0 else 0
             
-            row = [
+            yield (
                 symbol,
                 f"{best_bid:.4f}" if best_bid else "",
                 f"{best_ask:.4f}" if best_ask else "",
@@ -231,13 +300,7 @@ class DataExporter:
                 f"{stats.get('vwap', 0):.4f}",
                 stats.get('volume', 0),
                 stats.get('trade_count', 0)
-            ]
-            writer.writerow(row)
-        
-        csv_content = output.getvalue()
-        output.close()
-        
-        return csv_content
+            )
     
     def export_performance_metrics_to_csv(self, performance_stats):
         """
@@ -252,15 +315,6 @@ class DataExporter:
         if not performance_stats:
             return ""
         
-        # Create CSV in memory
-        output = io.StringIO()
-        
-        # Define CSV headers
-        headers = ['Metric', 'Value', 'Unit']
-        
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        
         # Write performance metrics
         metrics = [
             ('Total Trades', performance_stats.get('total_trades', 0), 'count'),
@@ -273,13 +327,12 @@ class DataExporter:
             ('Active Symbols', performance_stats.get('symbols_active', 0), 'count')
         ]
         
-        for metric_name, value, unit in metrics:
-            writer.writerow([metric_name, value, unit])
-        
-        csv_content = output.getvalue()
-        output.close()
+        # Names and units are fixed and values are numbers, so no field ever
+        # needs quoting and the lines are formatted directly
+        lines = ['Metric,Value,Unit\r\n']
+        lines.extend('%s,%s,%s\r\n' % metric for metric in metrics)
         
-        return csv_content
+        return ''.join(lines)
     
     def create_trade_analysis_dataframe(self, trades):
         """
@@ -331,44 +384,93 @@ class DataExporter:
         if not trades:
             return {}
         
-        df = self.create_trade_analysis_dataframe(trades)
-        
-        if df.empty:
-            return {}
+        # Pull the columns out once; every statistic is an array reduction
+        count = len(trades)
+        quantities = np.fromiter((trade.get('quantity', 0) for trade in trades),
+                                 dtype=np.int64, count=count)
+        prices = np.fromiter((trade.get('price', 0) for trade in trades),
+                             dtype=np.float64, count=count)
+        values = quantities * prices
         
         stats = {}
         
         # Overall statistics
-        stats['total_trades'] = len(df)
-        stats['total_volume'] = df['quantity'].sum()
-        stats['total_value'] = df['value'].sum()
-        stats['average_price'] = df['price'].mean()
-        stats['average_quantity'] = df['quantity'].mean()
-        stats['average_trade_value'] = df['value'].mean()
-        
-        # Price statistics
-        stats['price_std'] = df['price'].std()
-        stats['price_min'] = df['price'].min()
-        stats['price_max'] = df['price'].max()
+        stats['total_trades'] = count
+        stats['total_volume'] = quantities.sum()
+        stats['total_value'] = values.sum()
+        stats['average_price'] = prices.mean()
+        stats['average_quantity'] = quantities.mean()
+        stats['average_trade_value'] = values.mean()
+        
+        # Price statistics (sample standard deviation, as pandas reports)
+        stats['price_std'] = prices.std(ddof=1) if count > 1 else np.float64(np.nan)
+        stats['price_min'] = prices.min()
+        stats['price_max'] = prices.max()
         
         # Volume statistics
-        stats['volume_std'] = df['quantity'].std()
-        stats['volume_min'] = df['quantity'].min()
-        stats['volume_max'] = df['quantity'].max()
+        stats['volume_std'] = quantities.std(ddof=1) if count > 1 else np.float64(np.nan)
+        stats['volume_min'] = quantities.min()
+        stats['volume_max'] = quantities.max()
         
         # Time-based statistics
-        if len(df) > 1:
-            time_diff = (df.index[-1] - df.index[0]).total_seconds()
+        if count > 1:
+            first = pd.Timestamp(trades[0].get('timestamp', datetime.now()))
+            last = pd.Timestamp(trades[-1].get('timestamp', datetime.now()))
+            time_diff = (last - first).total_seconds()
             stats['trading_duration_seconds'] = time_diff
-            stats['trades_per_minute'] = len(df) / (time_diff / 60) if time_diff > 0 else 0
+            stats['trades_per_minute'] = count / (time_diff / 60) if time_diff > 0 else 0
         
         # Symbol-based statistics
-        symbol_stats = df.groupby('symbol').agg({
-            'quantity': ['count', 'sum', 'mean'],
-            'value': 'sum',
-            'price': ['mean', 'std', 'min', 'max']
-        }).round(4)
-        
-        stats['by_symbol'] = symbol_stats.to_dict() if not symbol_stats.empty else {}
+        symbols = np.array([trade.get('symbol', '') for trade in trades],
+                           dtype=object)
+        # Group a None or NaN symbol with the trades that have none at all
+        symbols[pd.isna(symbols)] = ''
+        codes, symbols = pd.factorize(symbols, sort=True)
+        stats['by_symbol'] = self._symbol_statistics(codes, symbols, quantities,
+                                                     prices, values)
         
         return stats
+    
+    @staticmethod
+    def _symbol_statistics(codes, symbols, quantities, prices, values):
+        """
+        Aggregate trade columns per symbol
+        
+        Args:
+            codes (np.ndarray): Symbol index of each trade
+            symbols (np.ndarray): Symbols, sorted, indexed by code
+            quantities, prices, values (np.ndarray): Per-trade columns
+            
+        Returns:
+            dict: (column, statistic) -> {symbol: value}, rounded to 4 places
+        """
+        counts = np.bincount(codes)
+        quantity_sums = np.bincount(codes, weights=quantities).astype(np.int64)
+        price_means = np.bincount(codes, weights=prices) / counts
+        
+        # Sample standard deviation from the squared deviations per symbol
+        deviations = prices - price_means[codes]
+        squares = np.bincount(codes, weights=deviations * deviations)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_stds = np.where(counts > 1,
+                                  np.sqrt(squares / (counts - 1)), np.nan)
+        
+        # Min and max over each symbol's run once trades are grouped
+        order = np.argsort(codes, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        
+        columns = {
+            ('quantity', 'count'): counts,
+            ('quantity', 'sum'): quantity_sums,
+            ('quantity', 'mean'): quantity_sums / counts,
+            ('value', 'sum'): np.bincount(codes, weights=values),
+            ('price', 'mean'): price_means,
+            ('price', 'std'): price_stds,
+            ('price', 'min'): np.minimum.reduceat(prices[order], starts),
+            ('price', 'max'): np.maximum.reduceat(prices[order], starts)
+        }
+        symbols = symbols.tolist()
+        return {
+            key: dict(zip(symbols, np.round(column, 4).tolist()))
+            for key, column in columns.items()
+        }